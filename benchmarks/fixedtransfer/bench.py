@@ -0,0 +1,197 @@
+"""
+FixedTransfer 离线基准测试
+
+用 stubs.py 中的替身模块代替 MoviePilot，在临时目录中生成剧集文件，
+测量从文件写入到整理记录写入的延迟分布和每秒处理文件数，用于发现事件处理流程的性能回退。
+
+依赖：watchdog、apscheduler、pytz
+
+用法（在仓库根目录执行）：
+    python benchmarks/fixedtransfer/bench.py
+    python benchmarks/fixedtransfer/bench.py --sizes 10,1000 --latency recognize=0.2,tmdb=0.1,transfer=0.02
+    python benchmarks/fixedtransfer/bench.py --mode compatibility --config '{"max_workers": 8}'
+"""
+import argparse
+import importlib.util
+import json
+import math
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import stubs  # noqa: E402
+
+# 插件目录
+PLUGIN_DIR = Path(__file__).resolve().parents[2] / "plugins.v2" / "fixedtransfer"
+
+
+def load_plugin():
+    """
+    以包的形式加载插件，插件内部使用相对导入
+    """
+    spec = importlib.util.spec_from_file_location("fixedtransfer", PLUGIN_DIR / "__init__.py",
+                                                  submodule_search_locations=[str(PLUGIN_DIR)])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["fixedtransfer"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_latency(text: str) -> Dict[str, float]:
+    """
+    解析 名称=秒数,名称=秒数 格式的模拟耗时
+    """
+    latency = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, value = item.partition("=")
+        if name not in stubs.LATENCY:
+            raise ValueError(f"未知的调用类型：{name}，可选：{', '.join(stubs.LATENCY)}")
+        latency[name] = float(value)
+    return latency
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """
+    已排序数据的分位数（最近秩）
+    """
+    if not values:
+        return 0.0
+    index = max(math.ceil(percent / 100 * len(values)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def run_burst(plugin_module, size: int, episodes: int, mode: str, config: dict, timeout: float) -> dict:
+    """
+    一次突发测试：启动插件，一次性写入 size 个文件，等待全部整理完成
+    """
+    workdir = Path(tempfile.mkdtemp(prefix="fixedtransfer-bench-"))
+    src, dst = workdir / "src", workdir / "dst"
+    src.mkdir()
+    dst.mkdir()
+    stubs.reset()
+
+    created: Dict[str, float] = {}
+    done: Dict[str, float] = {}
+    lock = threading.Lock()
+    finished = threading.Event()
+
+    def on_done(path: str, _: bool):
+        now = time.perf_counter()
+        with lock:
+            if path in done:
+                return
+            done[path] = now
+            if len(done) >= size:
+                finished.set()
+
+    stubs.ON_DONE = on_done
+    plugin = plugin_module.FixedTransfer()
+    plugin.init_plugin({
+        "enabled": True,
+        "notify": False,
+        "monitor_confs": f"{mode}#{src}#{dst}",
+        **config
+    })
+    try:
+        # 等待监控启动完成
+        time.sleep(1)
+        start = time.perf_counter()
+        for index in range(size):
+            series, episode = divmod(index, episodes)
+            season_dir = src / f"Series {series:05d}" / "Season 01"
+            if episode == 0:
+                season_dir.mkdir(parents=True, exist_ok=True)
+            path = season_dir / f"Series.{series:05d}.S01E{episode + 1:02d}.mkv"
+            with open(path, "wb") as f:
+                f.write(b"\0" * 1024)
+            created[str(path)] = time.perf_counter()
+        write_seconds = time.perf_counter() - start
+        finished.wait(timeout)
+        end = time.perf_counter()
+        with lock:
+            latencies = sorted(done[path] - created[path] for path in done if path in created)
+            last_done = max(done.values()) if done else end
+        metrics = plugin.metrics_stats()
+    finally:
+        plugin.stop_service()
+        stubs.ON_DONE = None
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    elapsed = last_done - start
+    return {
+        "size": size,
+        "done": len(latencies),
+        "timeout": len(latencies) < size,
+        "write_seconds": round(write_seconds, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "files_per_second": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1) if latencies else 0
+        },
+        "calls": dict(stubs.CALLS),
+        "stages": metrics.get("stages")
+    }
+
+
+def print_result(result: dict):
+    latency = result["latency_ms"]
+    status = "超时" if result["timeout"] else "完成"
+    print(f"\n== {result['size']} 个文件：{status} {result['done']}/{result['size']}，"
+          f"写入 {result['write_seconds']}s，总耗时 {result['elapsed_seconds']}s，"
+          f"{result['files_per_second']} 个/秒")
+    print(f"   写入到整理完成延迟(ms)：p50={latency['p50']} p95={latency['p95']} "
+          f"p99={latency['p99']} max={latency['max']}")
+    print(f"   调用次数：{json.dumps(result['calls'], ensure_ascii=False)}")
+    for name, stage in (result["stages"] or {}).items():
+        print(f"   {name:<18} n={stage['count']:<8} avg={stage['avg']:<8} "
+              f"p50={stage['p50']:<8} p95={stage['p95']:<8} p99={stage['p99']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FixedTransfer 离线基准测试")
+    parser.add_argument("--sizes", default="10,1000,100000", help="每次突发写入的文件数，逗号分隔")
+    parser.add_argument("--episodes", type=int, default=20, help="每季集数")
+    parser.add_argument("--latency", default="", help="模拟耗时，如 recognize=0.2,tmdb=0.1,transfer=0.02")
+    parser.add_argument("--mode", default="fast", choices=["fast", "compatibility"], help="监控模式")
+    parser.add_argument("--config", default="{}", help="覆盖插件配置，JSON格式")
+    parser.add_argument("--timeout", type=float, default=1800, help="每次突发的最长等待秒数")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args()
+
+    stubs.LATENCY.update(parse_latency(args.latency))
+    config = {"debounce": 1, "stable_seconds": 1, "poll_min_interval": 1, **json.loads(args.config)}
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    data_path = Path(tempfile.mkdtemp(prefix="fixedtransfer-bench-data-"))
+    stubs.install(data_path)
+    plugin_module = load_plugin()
+    results = []
+    try:
+        for size in sizes:
+            # 每次突发使用独立的任务队列和快照
+            for child in data_path.iterdir():
+                if child.is_file():
+                    child.unlink()
+            result = run_burst(plugin_module, size=size, episodes=max(args.episodes, 1), mode=args.mode,
+                               config=config, timeout=args.timeout)
+            results.append(result)
+            if not args.json:
+                print_result(result)
+    finally:
+        shutil.rmtree(data_path, ignore_errors=True)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    return 1 if any(result["timeout"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
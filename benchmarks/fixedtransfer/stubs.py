@@ -0,0 +1,392 @@
+"""
+FixedTransfer 基准测试用的 app.* 替身模块
+
+只实现插件用到的接口：识别、TMDB、图片、转移、刮削、历史记录、下载历史等调用
+按 LATENCY 中配置的耗时 sleep 模拟，不访问网络和数据库，转移不实际移动文件。
+"""
+import enum
+import logging
+import re
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+# 各类调用的模拟耗时（秒）
+LATENCY: Dict[str, float] = {
+    "metainfo": 0.0,
+    "download": 0.0,
+    "recognize": 0.0,
+    "images": 0.0,
+    "tmdb": 0.0,
+    "transfer": 0.0,
+    "history": 0.0,
+    "scrape": 0.0,
+    "message": 0.0
+}
+# 各类调用的次数
+CALLS: Dict[str, int] = {}
+# 已写入整理记录的源文件 -> 记录
+TRANSFERRED: Dict[str, object] = {}
+# 写入整理记录时的回调，参数为 (源文件路径, 是否成功)
+ON_DONE: Optional[Callable[[str, bool], None]] = None
+
+_lock = threading.Lock()
+# 当前最大的整理记录ID
+_max_id = 0
+
+
+def _call(name: str):
+    """
+    记录一次调用并模拟耗时
+    """
+    with _lock:
+        CALLS[name] = CALLS.get(name, 0) + 1
+    delay = LATENCY.get(name)
+    if delay:
+        time.sleep(delay)
+
+
+def reset():
+    """
+    清空调用计数和整理记录
+    """
+    global _max_id
+    with _lock:
+        CALLS.clear()
+        TRANSFERRED.clear()
+        _max_id = 0
+
+
+class _Logger(logging.Logger):
+    def warn(self, msg, *args, **kwargs):
+        self.warning(msg, *args, **kwargs)
+
+
+class _Obj:
+    """
+    任意属性对象，未设置的属性为None
+    """
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+    def __getattr__(self, item):
+        return None
+
+
+class MediaType(enum.Enum):
+    MOVIE = "电影"
+    TV = "电视剧"
+    UNKNOWN = "未知"
+
+
+class NotificationType(enum.Enum):
+    Manual = "手动处理"
+
+
+class MediaInfo(_Obj):
+    def get_message_image(self):
+        return None
+
+
+class FileItem(_Obj):
+    pass
+
+
+class TransferInfo(_Obj):
+    pass
+
+
+class TransferDirectoryConf(_Obj):
+    pass
+
+
+class Notification(_Obj):
+    pass
+
+
+class MetaInfoPath:
+    """
+    只识别 名称.SxxEyy 格式，其余按电影处理
+    """
+
+    def __init__(self, path: Path):
+        _call("metainfo")
+        stem = path.stem
+        match = re.search(r"[Ss](\d+)[Ee](\d+)", stem)
+        self.name = re.split(r"[ ._][Ss]\d+[Ee]\d+", stem)[0].replace(".", " ").strip() if stem else None
+        self.year = None
+        self.begin_season = int(match.group(1)) if match else None
+        self.begin_episode = int(match.group(2)) if match else None
+        self.type = MediaType.TV if match else MediaType.MOVIE
+        self.season = f"S{self.begin_season:02d}" if match else ""
+        self.season_episode = f"{self.season} E{self.begin_episode:02d}" if match else ""
+
+
+class _Settings:
+    RMT_MEDIAEXT = [".mkv", ".mp4", ".ts", ".avi", ".iso"]
+    TZ = "Asia/Shanghai"
+
+    @staticmethod
+    def MP_DOMAIN(url: str = ""):
+        return url
+
+
+class StringUtils:
+    @staticmethod
+    def format_ep(episodes):
+        return ",".join(f"E{ep:02d}" for ep in sorted(episodes))
+
+
+def _plugin_base(data_path: Path):
+    class _PluginBase:
+        plugin_config_prefix = ""
+
+        def __init__(self):
+            self._data = {}
+            self.config = {}
+
+        def update_config(self, config):
+            self.config = config
+
+        def get_data(self, key):
+            return self._data.get(key)
+
+        def save_data(self, key, value):
+            self._data[key] = value
+
+        def del_data(self, key):
+            self._data.pop(key, None)
+
+        @staticmethod
+        def get_data_path():
+            data_path.mkdir(parents=True, exist_ok=True)
+            return data_path
+
+    return _PluginBase
+
+
+class ChainBase:
+    def post_message(self, message):
+        _call("message")
+
+    def obtain_images(self, mediainfo):
+        _call("images")
+        return mediainfo
+
+    def transfer(self, fileitem, meta, mediainfo, target_directory, episodes_info=None, **kwargs):
+        _call("transfer")
+        target = Path(target_directory.library_path) / mediainfo.title / (meta.season or "movie")
+        return TransferInfo(success=True, fileitem=fileitem, transfer_type=target_directory.transfer_type,
+                            target_diritem=FileItem(path=str(target), storage="local"),
+                            target_item=FileItem(path=str(target / Path(fileitem.path).name)),
+                            total_size=fileitem.size or 0, file_count=1,
+                            need_scrape=target_directory.scraping, need_notify=True, message="")
+
+
+class MediaChain(ChainBase):
+    def recognize_by_meta(self, meta):
+        _call("recognize")
+        if not meta.name:
+            return None
+        return MediaInfo(title=meta.name, title_year=meta.name, tmdb_id=abs(hash(meta.name)) % 1000000,
+                         type=meta.type, year=None)
+
+    def recognize_media(self, **kwargs):
+        _call("recognize")
+        return MediaInfo(title="media", title_year="media", tmdb_id=kwargs.get("tmdbid"), type=kwargs.get("mtype"))
+
+    def scrape_metadata(self, fileitem, meta, mediainfo, **kwargs):
+        _call("scrape")
+
+
+class TmdbChain(ChainBase):
+    def tmdb_episodes(self, tmdbid, season, **kwargs):
+        _call("tmdb")
+        return []
+
+
+class StorageChain(ChainBase):
+    def get_file_item(self, storage, path):
+        path = Path(path)
+        if not path.exists():
+            return None
+        return FileItem(storage=storage, path=str(path), name=path.name, type="file", size=path.stat().st_size)
+
+    def delete_media_file(self, fileitem, delete_self=True):
+        pass
+
+
+class TransferChain(ChainBase):
+    def send_transfer_message(self, **kwargs):
+        _call("message")
+
+
+class TransferHistoryOper:
+    @staticmethod
+    def get_by_src(src, storage=None):
+        return TRANSFERRED.get(src)
+
+    @staticmethod
+    def __add(fileitem, success: bool):
+        """
+        与 MoviePilot 的 add_force 一致：先删除同一源文件的记录再新增，
+        ID 与 SQLite 的 INTEGER PRIMARY KEY 一样取当前最大值加一，删除最大ID后会被复用
+        """
+        global _max_id
+        _call("history")
+        with _lock:
+            old = TRANSFERRED.pop(str(fileitem.path), None)
+            if old is not None and old.id == _max_id:
+                _max_id = max((his.id for his in TRANSFERRED.values()), default=0)
+            _max_id += 1
+            his = _Obj(id=_max_id, src=str(fileitem.path), status=success, src_storage="local")
+            TRANSFERRED[his.src] = his
+        if ON_DONE:
+            ON_DONE(his.src, success)
+        return his
+
+    def add_success(self, fileitem, **kwargs):
+        return self.__add(fileitem, True)
+
+    def add_fail(self, fileitem, **kwargs):
+        return self.__add(fileitem, False)
+
+    @staticmethod
+    def delete(his_id):
+        for src, his in list(TRANSFERRED.items()):
+            if his.id == his_id:
+                TRANSFERRED.pop(src, None)
+
+
+class DownloadHistoryOper:
+    @staticmethod
+    def get_file_by_fullpath(fullpath):
+        _call("download")
+        return None
+
+    @staticmethod
+    def get_by_hash(download_hash):
+        _call("download")
+        return None
+
+
+class _Column:
+    """
+    查询条件占位，过滤时不做任何比较
+    """
+
+    def __eq__(self, other):
+        return True
+
+    __hash__ = object.__hash__
+
+    def in_(self, values):
+        return True
+
+    def desc(self):
+        return self
+
+
+class TransferHistory:
+    src = _Column()
+    src_storage = _Column()
+
+
+class DownloadHistory:
+    download_hash = _Column()
+    date = _Column()
+
+
+class DownloadFiles:
+    id = _Column()
+    fullpath = _Column()
+    download_hash = _Column()
+
+
+class _Query:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def filter(self, *args):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def all(self):
+        return list(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class ScopedSession:
+    @staticmethod
+    def query(*columns):
+        if columns and columns[0] is TransferHistory.src:
+            return _Query([(src,) for src in list(TRANSFERRED)])
+        if columns and columns[0] in (DownloadFiles.fullpath, DownloadHistory):
+            # 批量查询下载记录，替身中没有下载记录
+            _call("download")
+        return _Query([])
+
+    def close(self):
+        pass
+
+
+class _Noop:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, item):
+        return lambda *args, **kwargs: None
+
+
+def install(data_path: Path, level: int = logging.WARNING):
+    """
+    注册替身模块到 sys.modules
+    :param data_path: 插件数据目录
+    :param level: 日志级别
+    """
+    logging.setLoggerClass(_Logger)
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(threadName)s %(message)s")
+    logger = logging.getLogger("fixedtransfer-bench")
+    logger.setLevel(level)
+
+    def module(name: str, **attrs):
+        mod = types.ModuleType(name)
+        mod.__dict__.update(attrs)
+        mod.__path__ = []
+        sys.modules[name] = mod
+
+    module("app")
+    module("app.log", logger=logger)
+    module("app.plugins", _PluginBase=_plugin_base(Path(data_path)))
+    module("app.core")
+    module("app.core.config", settings=_Settings())
+    module("app.core.metainfo", MetaInfoPath=MetaInfoPath)
+    module("app.core.context", MediaInfo=MediaInfo)
+    module("app.schemas", MediaInfo=MediaInfo, TransferInfo=TransferInfo, Notification=Notification,
+           FileItem=FileItem, TransferDirectoryConf=TransferDirectoryConf)
+    module("app.schemas.types", MediaType=MediaType, NotificationType=NotificationType)
+    module("app.utils")
+    module("app.utils.string", StringUtils=StringUtils)
+    module("app.chain", ChainBase=ChainBase)
+    module("app.chain.media", MediaChain=MediaChain)
+    module("app.chain.tmdb", TmdbChain=TmdbChain)
+    module("app.chain.storage", StorageChain=StorageChain)
+    module("app.chain.transfer", TransferChain=TransferChain)
+    module("app.db", ScopedSession=ScopedSession)
+    module("app.db.models")
+    module("app.db.models.downloadhistory", DownloadHistory=DownloadHistory, DownloadFiles=DownloadFiles)
+    module("app.db.models.transferhistory", TransferHistory=TransferHistory)
+    module("app.db.transferhistory_oper", TransferHistoryOper=TransferHistoryOper)
+    module("app.db.downloadhistory_oper", DownloadHistoryOper=DownloadHistoryOper)
+    module("app.db.systemconfig_oper", SystemConfigOper=_Noop)
+    module("app.helper")
+    module("app.helper.directory", DirectoryHelper=_Noop)
+    module("app.helper.message", MessageHelper=_Noop)
@@ -1,11 +1,17 @@
 import threading
 import datetime
+import hashlib
+import os
 from pathlib import Path
 import platform
+import contextlib
+import copy
+import time
 import traceback
 import pytz
+from concurrent.futures import ThreadPoolExecutor
 
-from typing import Any, List, Dict, Tuple, Optional
+from typing import Any, Callable, List, Dict, Tuple, Optional
 from app.chain.tmdb import TmdbChain
 from app.core.metainfo import MetaInfoPath
 from app.schemas import MediaInfo, TransferInfo
@@ -17,9 +23,9 @@ from watchdog.observers.polling import PollingObserver
 from app.log import logger
 from app.plugins import _PluginBase
 from app.core.config import settings
-from app.utils.system import SystemUtils
 from app.schemas.types import NotificationType
 from watchdog.events import FileSystemEventHandler, FileSystemMovedEvent, FileSystemEvent
+from watchdog.events import EVENT_TYPE_CREATED, EVENT_TYPE_MOVED
 import re
 from app.db.downloadhistory_oper import DownloadHistoryOper
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -34,7 +40,10 @@ from app.chain.transfer import TransferChain
 from app.core.config import settings
 from app.core.context import MediaInfo
 from app.core.metainfo import MetaInfoPath
+from app.db import ScopedSession
 from app.db.downloadhistory_oper import DownloadHistoryOper
+from app.db.models.downloadhistory import DownloadHistory, DownloadFiles
+from app.db.models.transferhistory import TransferHistory
 from app.db.systemconfig_oper import SystemConfigOper
 from app.db.transferhistory_oper import TransferHistoryOper
 from app.helper.directory import DirectoryHelper
@@ -44,6 +53,26 @@ from app.schemas import FileItem, TransferInfo, Notification
 from app.schemas.types import MediaType, NotificationType
 from app.utils.string import StringUtils
 
+from .batch import ScrapeBatch
+from .cache import TTLCache
+from .downloads import DownloadLookup
+from .copyengine import CopyEngine
+from .eventqueue import DebounceQueue
+from .fsprobe import TransferProbe
+from .inflight import InFlightRegistry
+from .iosched import DeviceScheduler, IoLease
+from .jobstore import JobStore
+from .metrics import Metrics
+from .notifier import FileRecord, MessageAggregator, MessageGroup
+from .pathfilter import PathFilter
+from .poller import PollingMonitor
+from .retry import PermanentError, RetryQueue
+from .scanner import scan_files
+from .snapshot import DirectorySnapshot
+from .srcindex import TransferredIndex
+from .stability import StabilityGate
+from .watchbudget import WatchBudget
+
 class MonitorChain(ChainBase):
     pass
 
@@ -52,10 +81,29 @@ class FileMonitorHandler(FileSystemEventHandler):
     目录监控响应类
     """
 
-    def __init__(self, mon_path: Path, callback: Any, **kwargs):
+    def __init__(self, mon_path: Path, callback: Any, path_filter: PathFilter = None, **kwargs):
         super(FileMonitorHandler, self).__init__(**kwargs)
         self._watch_path = mon_path
         self.callback = callback
+        self._path_filter = path_filter
+
+    def dispatch(self, event: FileSystemEvent):
+        """
+        只分发新文件的创建和移动事件，目录、非媒体文件、回收站及隐藏文件、命中排除关键字的文件在监控线程中直接丢弃
+        """
+        if event.is_directory:
+            return
+        if event.event_type == EVENT_TYPE_MOVED:
+            # 改名后原路径的缓存失效，无论新路径是否需要处理
+            self.callback.file_renamed(os.fsdecode(event.src_path))
+            path = event.dest_path
+        elif event.event_type == EVENT_TYPE_CREATED:
+            path = event.src_path
+        else:
+            return
+        if self._path_filter and not self._path_filter.accept(os.fsdecode(path)):
+            return
+        super(FileMonitorHandler, self).dispatch(event)
 
     def on_created(self, event: FileSystemEvent):
         self.callback.event_handler(event=event, text="创建",
@@ -74,7 +122,7 @@ class FixedTransfer(_PluginBase):
     # 插件图标
     plugin_icon = "torrenttransfer.jpg"
     # 插件版本
-    plugin_version = "1.0"
+    plugin_version = "1.25"
     # 插件作者
     plugin_author = "longqiuyu"
     # 作者主页
@@ -96,27 +144,129 @@ class FixedTransfer(_PluginBase):
     _exclude_keywords = ""
     # 整理方式
     _transfer_type = "link"
+    # 按目录对自动选择硬链接或复制
+    _auto_transfer = False
+    # 复制模式使用插件内置的复制引擎
+    _copy_engine_enabled = False
     # 是否刮削
     _scraping = False
     # 延时
     _interval = 10
     # 是否发送通知
     _notify = False
+    # 事件防抖窗口（秒）
+    _debounce = 3
+    # 事件队列容量
+    _queue_size = 10000
+    # 并发整理文件数
+    _max_workers = 4
+    # 网络阶段并发数（识别、TMDB、图片、刮削）
+    _net_concurrency = 4
+    # 磁盘阶段并发数（转移）
+    _io_concurrency = 2
+    # 复制类转移每个设备的并发数
+    _io_per_device = 1
+    # 复制引擎总带宽上限（MB/s），0为不限速，其它复制方式及Rclone不受限制
+    _io_bandwidth = 0
+    # 转移后处理（刮削、消息、清理）并发数
+    _post_concurrency = 2
+    # 文件稳定时间（秒）
+    _stable_seconds = 5
+    # 全量同步扫描线程数
+    _scan_workers = 4
+    # 轮询最小间隔（秒）
+    _poll_min_interval = 10
+    # 轮询最大间隔（秒）
+    _poll_max_interval = 300
+    # inotify 监控预算，0为按系统上限自动计算
+    _watch_budget = 0
+    # 失败重试次数，0为不重试
+    _retry_times = 3
+    # 首次重试延迟（秒），之后每次加倍
+    _retry_delay = 60
+    # 同时进行的重试数
+    _retry_concurrency = 2
+    # 缓存有效期（秒）
+    _cache_ttl = 3600
+    # 缓存条数上限
+    _cache_size = 1024
+    # 未识别结果的缓存有效期（秒）
+    _negative_ttl = 300
 
     # 目录配置
     _dirconf = {}
+    # 监控目录 -> 实际使用的整理方式
+    _transfer_types: Dict[str, str] = {}
+    # 转移方式探测
+    _transfer_probe: Optional[TransferProbe] = None
     # 消息汇总
-    _msg_medias = {}
+    _aggregator: Optional[MessageAggregator] = None
+    # 停止时未发送的消息组，重新配置后交给新的汇总服务
+    _msg_groups: List[MessageGroup] = []
     # 退出事件
     _event = threading.Event()
     # 监控服务
     _observers = []
+    # 所有实时监控目录共用的监控线程
+    _observer: Any = None
+    # inotify 监控预算
+    _watch_manager: Optional[WatchBudget] = None
+    # 轮询监控
+    _poller: Optional[PollingMonitor] = None
     # 定时器
     _scheduler: Optional[BackgroundScheduler] = None
+    # 事件队列
+    _queue: Optional[DebounceQueue] = None
+    # 持久化任务队列
+    _jobstore: Optional[JobStore] = None
+    # 失败重试队列
+    _retry: Optional[RetryQueue] = None
+    # 各阶段耗时与计数统计
+    _metrics: Optional[Metrics] = None
+    # 文件稳定检测
+    _gate: Optional[StabilityGate] = None
+    # 整理线程池
+    _executor: Optional[ThreadPoolExecutor] = None
+    # 线程池待处理任务上限
+    _executor_slots: Optional[threading.BoundedSemaphore] = None
+    # 已提交未完成的任务数
+    _pending_tasks = 0
+    _pending_lock = threading.Lock()
+    # 转移后处理线程池（低优先级）
+    _post_executor: Optional[ThreadPoolExecutor] = None
+    # 转移后处理待执行任务上限
+    _post_slots: Optional[threading.BoundedSemaphore] = None
+    # 转移后处理未完成的任务数
+    _post_pending = 0
+    # 网络阶段并发限制
+    _net_semaphore: Optional[threading.BoundedSemaphore] = None
+    # 磁盘阶段并发限制
+    _io_semaphore: Optional[threading.BoundedSemaphore] = None
+    # 复制类转移按设备调度
+    _io_scheduler: Optional[DeviceScheduler] = None
+    # 本地复制引擎
+    _copy_engine: Optional[CopyEngine] = None
+    # 识别结果缓存
+    _recognize_cache: Optional[TTLCache] = None
+    # 剧集信息缓存
+    _episodes_cache: Optional[TTLCache] = None
+    # 媒体图片缓存
+    _images_cache: Optional[TTLCache] = None
+    # 下载历史缓存
+    _downloads: Optional[DownloadLookup] = None
+    # 文件名解析结果缓存
+    _meta_cache: Optional[TTLCache] = None
+    # 已整理源文件索引
+    _transferred: Optional[TransferredIndex] = None
+    # 路径过滤规则
+    _path_filter: Optional[PathFilter] = None
+    # 正在处理的文件
+    _inflight: Optional[InFlightRegistry] = None
 
     def init_plugin(self, config: dict = None):
         # 清空配置
         self._dirconf = {}
+        self._transfer_types = {}
         self._renameconf = {}
         self._coverconf = {}
 
@@ -136,22 +286,122 @@ class FixedTransfer(_PluginBase):
         if config:
             self._enabled = config.get("enabled")
             self._onlyonce = config.get("onlyonce")
-            self._interval = config.get("interval")
+            self._interval = self.__get_number(config, "interval", 10)
             self._notify = config.get("notify")
             self._monitor_confs = config.get("monitor_confs")
             self._exclude_keywords = config.get("exclude_keywords") or ""
             self._transfer_type = config.get("transfer_type") or "link"
+            self._auto_transfer = config.get("auto_transfer") or False
+            self._copy_engine_enabled = config.get("copy_engine") or False
             self._scraping = config.get("scraping") or False
+            self._debounce = self.__get_number(config, "debounce", 3)
+            self._queue_size = int(self.__get_number(config, "queue_size", 10000))
+            self._max_workers = int(self.__get_number(config, "max_workers", 4)) or 1
+            self._net_concurrency = int(self.__get_number(config, "net_concurrency", 4)) or 1
+            self._io_concurrency = int(self.__get_number(config, "io_concurrency", 2)) or 1
+            self._io_per_device = int(self.__get_number(config, "io_per_device", 1)) or 1
+            self._io_bandwidth = self.__get_number(config, "io_bandwidth", 0)
+            self._post_concurrency = int(self.__get_number(config, "post_concurrency", 2)) or 1
+            self._stable_seconds = self.__get_number(config, "stable_seconds", 5)
+            self._scan_workers = int(self.__get_number(config, "scan_workers", 4)) or 1
+            self._poll_min_interval = self.__get_number(config, "poll_min_interval", 10) or 10
+            self._poll_max_interval = self.__get_number(config, "poll_max_interval", 300) or 300
+            self._watch_budget = int(self.__get_number(config, "watch_budget", 0))
+            self._retry_times = int(self.__get_number(config, "retry_times", 3))
+            self._retry_delay = self.__get_number(config, "retry_delay", 60)
+            self._retry_concurrency = int(self.__get_number(config, "retry_concurrency", 2)) or 1
+            self._cache_ttl = self.__get_number(config, "cache_ttl", 3600)
+            self._cache_size = int(self.__get_number(config, "cache_size", 1024)) or 1
 
         # 停止现有任务
         self.stop_service()
+        # 停用插件时立即发送未发送的消息，关闭通知时丢弃
+        if self._msg_groups and not (self._notify and (self._enabled or self._onlyonce)):
+            groups, self._msg_groups = self._msg_groups, []
+            for group in groups if self._notify else []:
+                try:
+                    self.__send_msg(group)
+                except Exception as e:
+                    logger.error(f"发送 {group.key} 入库消息出错：{e}")
+
+        # 路径过滤规则只在配置变化时编译一次
+        self._path_filter = PathFilter(extensions=self.all_exts, exclude_keywords=self._exclude_keywords)
+
+        # 识别结果缓存，同一季的文件只识别一次
+        self._recognize_cache = TTLCache(maxsize=self._cache_size, ttl=self._cache_ttl,
+                                         negative_ttl=min(self._negative_ttl, self._cache_ttl))
+        # 剧集信息和媒体图片缓存，同一部剧只查询一次
+        self._episodes_cache = TTLCache(maxsize=self._cache_size, ttl=self._cache_ttl,
+                                        negative_ttl=min(self._negative_ttl, self._cache_ttl))
+        self._images_cache = TTLCache(maxsize=self._cache_size, ttl=self._cache_ttl, negative_ttl=0)
+        # 文件名解析结果只与路径名称有关，不过期，容量与队列一致，全量同步时已解析过的文件不再解析
+        self._meta_cache = TTLCache(maxsize=self._queue_size, ttl=None)
+        # 下载历史缓存，同一种子的文件只查询一次
+        self._downloads = DownloadLookup(loader=self.__load_download_history,
+                                         file_fallback=self.__get_download_hash,
+                                         history_fallback=self.downloadhis.get_by_hash,
+                                         maxsize=self._cache_size, ttl=self._cache_ttl)
+        # 各阶段耗时统计
+        self._metrics = Metrics()
 
         if self._enabled or self._onlyonce:
+            # 持久化任务队列，记录收到但未处理完的文件
+            self._jobstore = JobStore(file=self.get_data_path() / "jobs.db")
+            try:
+                self._jobstore.open()
+            except Exception as e:
+                logger.error(f"打开任务队列失败：{e}，重启后将无法恢复未完成的任务")
+                self._jobstore = None
+            # 已整理源文件索引，一次查询加载，之后不再逐个文件查询历史记录
+            self._transferred = TransferredIndex(
+                loader=lambda: self.__list_transferred_src(storage="local"),
+                fallback=lambda path: self.transferhis.get_by_src(path, storage="local"))
+            self._transferred.load()
             # 定时服务
             self._scheduler = BackgroundScheduler(timezone=settings.TZ)
+            # 整理线程池，网络阶段和磁盘阶段分别限制并发
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                thread_name_prefix="fixedtransfer-worker")
+            self._executor_slots = threading.BoundedSemaphore(self._max_workers * 2)
+            # 转移后处理线程池，刮削慢时不占用整理线程
+            self._post_executor = ThreadPoolExecutor(max_workers=self._post_concurrency,
+                                                     thread_name_prefix="fixedtransfer-post",
+                                                     initializer=self.__lower_priority)
+            self._post_slots = threading.BoundedSemaphore(self._queue_size)
+            self._net_semaphore = threading.BoundedSemaphore(self._net_concurrency)
+            self._io_semaphore = threading.BoundedSemaphore(self._io_concurrency)
+            self._io_scheduler = DeviceScheduler(per_device=self._io_per_device,
+                                                 bandwidth=self._io_bandwidth * 1024 * 1024,
+                                                 stopped=self._event)
+            if self._copy_engine_enabled:
+                self._copy_engine = CopyEngine(extensions=self._path_filter.extensions, stopped=self._event)
+            self._inflight = InFlightRegistry()
+            # 失败重试队列
+            self._retry = RetryQueue(submit=self.__submit_retry, max_attempts=self._retry_times,
+                                     base_delay=self._retry_delay, max_concurrent=self._retry_concurrency,
+                                     name="fixedtransfer-retry")
+            self._retry.start()
+            # 文件稳定后才放行到线程池
+            self._gate = StabilityGate(consumer=self.__process_batch, stable_seconds=self._stable_seconds,
+                                       maxsize=self._queue_size, name="fixedtransfer-stability",
+                                       on_drop=self.__drop_jobs)
+            self._gate.start()
+            # 事件队列，监控线程只负责入队
+            self._queue = DebounceQueue(consumer=self._gate.add, debounce=self._debounce,
+                                        maxsize=self._queue_size, name="fixedtransfer-queue")
+            self._queue.start()
             if self._notify:
-                # 追加入库消息统一发送服务
-                self._scheduler.add_job(self.__send_msg, trigger='interval', seconds=15)
+                # 入库消息汇总发送服务
+                self._aggregator = MessageAggregator(send=self.__send_msg, interval=self._interval,
+                                                     name="fixedtransfer-message")
+                self._aggregator.adopt(self._msg_groups)
+                self._msg_groups = []
+                self._aggregator.start()
+
+            # inotify 监控预算
+            self._watch_manager = WatchBudget(budget=self._watch_budget)
+            # 转移方式探测，每次启动重新探测
+            self._transfer_probe = TransferProbe()
 
             # 读取目录配置
             monitor_confs = self._monitor_confs.split("\n")
@@ -172,6 +422,14 @@ class FixedTransfer(_PluginBase):
 
                 # 存储目录监控配置
                 self._dirconf[source_dir] = target_dir
+                # 探测源目录和目标目录是否支持硬链接，自动选择整理方式
+                if self._auto_transfer and self._transfer_type in TransferProbe.AUTO_TYPES:
+                    self._transfer_probe.probe(source_dir, target_dir)
+                    self._transfer_types[source_dir] = self._transfer_probe.choose(source_dir, target_dir,
+                                                                                   self._transfer_type)
+                    if self._transfer_types[source_dir] != self._transfer_type:
+                        logger.info(f"{source_dir} -> {target_dir} 整理方式自动切换为 "
+                                    f"{self._transfer_types[source_dir]}")
 
                 # 启用目录监控
                 if self._enabled:
@@ -187,27 +445,18 @@ class FixedTransfer(_PluginBase):
 
                     try:
                         if mode == "fast":
-                            observer = self.__choose_observer()
+                            self.__watch(source_dir)
                         else:
-                            observer = PollingObserver()
-                        self._observers.append(observer)
-                        observer.schedule(FileMonitorHandler(source_dir, self), path=source_dir, recursive=True)
-                        observer.daemon = True
-                        observer.start()
+                            # 快照比对轮询，只检查目录修改时间
+                            self.__get_poller().schedule(source_dir, callback=self.__on_polled)
                         logger.info(f"已启动 {source_dir} 的目录监控服务, 监控模式：{mode}")
                     except Exception as e:
-                        err_msg = str(e)
-                        if "inotify" in err_msg and "reached" in err_msg:
-                            logger.warn(
-                                f"目录监控服务启动出现异常：{err_msg}，请在宿主机上（不是docker容器内）执行以下命令并重启："
-                                + """
-                                echo fs.inotify.max_user_watches=524288 | sudo tee -a /etc/sysctl.conf
-                                echo fs.inotify.max_user_instances=524288 | sudo tee -a /etc/sysctl.conf
-                                sudo sysctl -p
-                                """)
-                        else:
-                            logger.error(f"{source_dir} 启动目录监控失败：{err_msg}")
-                        self.systemmessage.put(f"{source_dir} 启动目录监控失败：{err_msg}", title="目录监控")
+                        self.__monitor_error(source_dir, e)
+
+            # 清理不再续传的复制暂存文件
+            self.__sweep_staging()
+            # 恢复上次未处理完的任务
+            self.__resume_jobs()
 
             # 运行一次定时服务
             if self._onlyonce:
@@ -226,6 +475,122 @@ class FixedTransfer(_PluginBase):
                 self._scheduler.print_jobs()
                 self._scheduler.start()
     
+    def __monitor_error(self, source_dir: str, err: Exception):
+        """
+        记录目录监控启动失败
+        """
+        err_msg = str(err)
+        if "inotify" in err_msg and "reached" in err_msg:
+            logger.warn(
+                f"目录监控服务启动出现异常：{err_msg}，请在宿主机上（不是docker容器内）执行以下命令并重启："
+                + """
+                echo fs.inotify.max_user_watches=524288 | sudo tee -a /etc/sysctl.conf
+                echo fs.inotify.max_user_instances=524288 | sudo tee -a /etc/sysctl.conf
+                sudo sysctl -p
+                """)
+        else:
+            logger.error(f"{source_dir} 启动目录监控失败：{err_msg}")
+        self.systemmessage.put(f"{source_dir} 启动目录监控失败：{err_msg}", title="目录监控")
+
+    def __get_poller(self) -> PollingMonitor:
+        """
+        获取轮询监控，所有轮询目录共用一个线程
+        """
+        if not self._poller:
+            self._poller = PollingMonitor(extensions=self._path_filter.extensions,
+                                          skip_dir=self._path_filter.ignored_name,
+                                          min_interval=self._poll_min_interval,
+                                          max_interval=self._poll_max_interval,
+                                          name="fixedtransfer-polling")
+            self._poller.start()
+        return self._poller
+
+    def __watch(self, source_dir: str):
+        """
+        实时监控目录，所有目录共用一个监控线程，超出 inotify 预算的子目录改为轮询
+        """
+        if not self._observer:
+            self._observer = self.__choose_observer()
+            self._observer.daemon = True
+            self._observer.start()
+            self._observers.append(self._observer)
+        watch_paths, need_poll = self._watch_manager.plan(source_dir)
+        handler = FileMonitorHandler(source_dir, self, path_filter=self._path_filter)
+        watched = []
+        for path in watch_paths:
+            try:
+                self._observer.schedule(handler, path=path, recursive=True)
+                watched.append(path)
+            except Exception as e:
+                # 启动失败的部分改为轮询
+                self._watch_manager.release(path)
+                self.__monitor_error(path, e)
+                need_poll = True
+        if need_poll:
+            self.__get_poller().schedule(source_dir, callback=self.__on_polled, exclude=watched)
+
+    def job_stats(self) -> Dict[str, Any]:
+        """
+        API: 持久化任务队列中各状态的任务数
+        """
+        return self._jobstore.counts() if self._jobstore is not None else {}
+
+    def metrics_stats(self) -> Dict[str, Any]:
+        """
+        API: 各阶段耗时分位数（毫秒）、处理计数及当前积压
+        """
+        stats = self._metrics.snapshot() if self._metrics else {"counters": {}, "stages": {}}
+        with self._pending_lock:
+            executor = self._pending_tasks
+        stats["backlog"] = {
+            "debounce": self._queue.qsize() if self._queue else 0,
+            "stability": self._gate.qsize() if self._gate else 0,
+            "executor": executor,
+            "inflight": len(self._inflight) if self._inflight is not None else 0,
+            "post": self._post_pending,
+            "retry": self._retry.qsize() if self._retry else 0,
+            "message": self._aggregator.pending() if self._aggregator else 0
+        }
+        return stats
+
+    def transfer_stats(self) -> Dict[str, Any]:
+        """
+        API: 各目录对的转移方式探测结果及实际使用的整理方式
+        """
+        return {
+            "configured": self._transfer_type,
+            "auto": self._auto_transfer,
+            "probes": self._transfer_probe.stats() if self._transfer_probe else {},
+            "io": self._io_scheduler.stats() if self._io_scheduler else {},
+            "types": {source: self._transfer_types.get(source, self._transfer_type) for source in self._dirconf}
+        }
+
+    def copy_progress(self) -> List[Dict[str, Any]]:
+        """
+        API: 复制引擎正在复制及最近完成的文件进度（速度单位 MB/s）
+        """
+        return self._copy_engine.progress() if self._copy_engine else []
+
+    def watch_stats(self) -> Dict[str, Any]:
+        """
+        API: 目录监控状态，inotify 预算使用情况及轮询目录
+        """
+        return {
+            "inotify": self._watch_manager.stats() if self._watch_manager else {},
+            "polling": self._poller.stats() if self._poller else []
+        }
+
+    @staticmethod
+    def __get_number(config: dict, key: str, default: float) -> float:
+        """
+        读取数值配置，为空或格式错误时使用默认值
+        """
+        try:
+            value = float(config.get(key))
+        except (TypeError, ValueError):
+            return default
+        return value if value >= 0 else default
+
     @staticmethod
     def __choose_observer() -> Any:
         """
@@ -252,86 +617,406 @@ class FixedTransfer(_PluginBase):
         立即运行一次，全量同步目录中所有文件
         """
         logger.info("开始全量同步短剧监控目录 ...")
+        # 重新加载索引，包含在其它地方新增或删除的历史记录
+        if self._transferred is not None:
+            self._transferred.load()
         # 遍历所有监控目录
         for mon_path in self._dirconf.keys():
             logger.debug(mon_path)
-            # 遍历目录下所有文件
-            for file_path in SystemUtils.list_files(Path(mon_path), settings.RMT_MEDIAEXT):
-                self.__handle_file(is_directory=Path(file_path).is_dir(),event_path=Path(file_path),source_dir=mon_path, storage='local')
+            # 与上次全量同步的快照比较，只处理新增或变化的文件
+            snapshot = self.__get_snapshot(mon_path)
+            old_entries = snapshot.load()
+            entries = {}
+            queued = 0
+            # 并行扫描目录，边扫描边加入队列
+            for path, st in scan_files(mon_path, self._path_filter.extensions, workers=self._scan_workers,
+                                       skip_dir=self._path_filter.ignored_name):
+                signature = DirectorySnapshot.signature(st)
+                entries[path] = signature
+                if not self._path_filter.accept(path):
+                    continue
+                # 未变化且已整理过的文件跳过，历史记录已删除的文件需要重新整理
+                if old_entries.get(path) == signature \
+                        and self.__is_transferred(path, storage="local", confirm=False):
+                    continue
+                # 与目录监控共用队列，重复路径自动合并
+                if not self.__enqueue(mon_path=mon_path, text="全量", event_path=path):
+                    logger.warn("事件队列已停止，全量同步中断")
+                    return
+                queued += 1
+            snapshot.save(entries)
+            logger.info(f"{mon_path} 共 {len(entries)} 个媒体文件，{queued} 个新增或变化的文件已加入处理队列")
         logger.info("全量同步短剧监控目录完成！")
 
-    
+    def __get_snapshot(self, mon_path: str) -> DirectorySnapshot:
+        """
+        获取监控目录的快照，目的目录、排除关键字、媒体文件类型变化时快照作废
+        """
+        name = hashlib.md5(mon_path.encode("utf-8")).hexdigest()
+        fingerprint = hashlib.md5("|".join([
+            str(self._dirconf.get(mon_path)),
+            self._exclude_keywords or "",
+            ",".join(sorted(self.all_exts))
+        ]).encode("utf-8")).hexdigest()
+        return DirectorySnapshot(root=mon_path,
+                                 file=self.get_data_path() / "snapshots" / f"{name}.json.gz",
+                                 fingerprint=fingerprint)
+
+    def __submit(self, fn: Callable, on_done: Callable[[], None] = None,
+                 on_cancel: Callable[[], None] = None, **kwargs) -> bool:
+        """
+        提交任务到整理线程池，积压过多时阻塞
+        :param fn: 任务
+        :param on_done: 任务结束回调
+        :param on_cancel: 任务未执行即被取消（插件停止）时的回调
+        :return: 是否提交成功
+        """
+        if self._event.is_set() or not self._executor:
+            return False
+        # 线程池积压过多时阻塞队列分发，由防抖队列向监控线程施加反压
+        self._executor_slots.acquire()
+        with self._pending_lock:
+            self._pending_tasks += 1
+        try:
+            future = self._executor.submit(fn, **kwargs)
+        except RuntimeError:
+            # 线程池已关闭
+            self.__task_done(None)
+            return False
+        future.add_done_callback(self.__task_done)
+        if on_done:
+            future.add_done_callback(lambda _: on_done())
+        if on_cancel:
+            future.add_done_callback(lambda f: on_cancel() if f.cancelled() else None)
+        return True
+
+    def __task_done(self, _):
+        """
+        线程池任务完成回调
+        """
+        with self._pending_lock:
+            self._pending_tasks -= 1
+        self._executor_slots.release()
+
     def event_handler(self, event, mon_path: Path, text: str, event_path: Path):
         """
-        处理文件变化
+        处理文件变化，仅放入防抖队列，由队列分发线程处理
         :param event: 事件
-        :param source_dir: 监控目录
+        :param mon_path: 监控目录
+        :param text: 事件描述
+        :param event_path: 事件文件路径
+        """
+        self.__enqueue(mon_path=str(mon_path), text=text, event_path=str(event_path),
+                       is_directory=event.is_directory)
+
+    def file_renamed(self, path: str):
+        """
+        文件改名或移走，删除原路径的缓存
+        :param path: 原路径
+        """
+        if self._meta_cache is not None:
+            self._meta_cache.invalidate(self.__meta_key(Path(path)))
+        if self._downloads is not None:
+            self._downloads.invalidate(path)
+        # 原路径已不存在，删除对应的任务，新路径另有事件
+        self.__set_job_state(path, JobStore.DONE)
+
+    def __drop_jobs(self, paths: List[str]):
+        """
+        稳定检测期间已消失的文件，删除对应的任务
+        """
+        if self._jobstore is not None:
+            self._jobstore.set_states(paths, JobStore.DONE)
+
+    @staticmethod
+    def __meta_key(path: Path) -> tuple:
+        """
+        文件名解析缓存的键，MetaInfoPath 只使用文件名和上两级目录名
+        """
+        return path.parent.parent.name, path.parent.name, path.name
+
+    def __parse_meta(self, path: Path) -> MetaInfoPath:
+        """
+        解析文件名，结果缓存，返回副本避免整理过程中的修改影响缓存
+        """
+        if self._meta_cache is None:
+            return MetaInfoPath(path)
+        return copy.deepcopy(self._meta_cache.get_or_load(self.__meta_key(path), lambda: MetaInfoPath(path)))
+
+    def __sweep_staging(self):
+        """
+        清理各目标目录下遗留的暂存文件，只保留会恢复的未完成任务的暂存文件
+        """
+        keep: Dict[str, List[Path]] = {}
+        jobs = self._jobstore.unfinished() if self._jobstore is not None else []
+        for path, mon_path, *_ in jobs:
+            target_dir = self._dirconf.get(mon_path)
+            if target_dir and Path(path).exists():
+                keep.setdefault(target_dir, []).append(CopyEngine.staging_path(Path(path), target_dir))
+        for target_dir in set(self._dirconf.values()):
+            if not target_dir:
+                continue
+            removed = CopyEngine.sweep(target_dir, keep=keep.get(target_dir, ()))
+            if removed:
+                logger.info(f"已清理 {target_dir} 下 {removed} 个遗留的暂存文件")
+
+    def __resume_jobs(self):
+        """
+        重新放入上次退出时未处理完的任务，监控目录已不在配置中或文件已不存在的任务丢弃
+        """
+        if self._jobstore is None:
+            return
+        jobs = self._jobstore.unfinished()
+        if not jobs:
+            return
+        resumed = 0
+        dropped = []
+        failed = []
+        for path, mon_path, text, state, is_directory, attempt in jobs:
+            # 监控目录已不在配置中，或文件已删除、改名
+            if mon_path not in self._dirconf or not os.path.exists(path):
+                dropped.append(path)
+                continue
+            if state == JobStore.RETRYING:
+                # 已有失败记录，从记录的次数继续重试，不再经过历史记录检查
+                if self._retry and self._retry.schedule(path, (mon_path, text, is_directory), attempt):
+                    resumed += 1
+                else:
+                    failed.append(path)
+                continue
+            if self.__enqueue(mon_path=mon_path, text=text, event_path=path, is_directory=is_directory):
+                resumed += 1
+        if dropped:
+            self._jobstore.set_states(dropped, JobStore.DONE)
+        if failed:
+            self._jobstore.set_states(failed, JobStore.FAILED)
+        logger.info(f"已恢复 {resumed} 个未完成的整理任务")
+
+    def __set_job_state(self, path: str, state: str):
+        """
+        更新持久化任务状态
+        """
+        if self._jobstore is not None:
+            self._jobstore.set_state(path, state)
+
+    def __on_polled(self, event_path: str, mon_path: str):
+        """
+        轮询监控发现新文件
+        """
+        if not self._path_filter.accept(event_path):
+            return
+        self.__enqueue(mon_path=mon_path, text="轮询", event_path=event_path)
+
+    def __enqueue(self, mon_path: str, text: str, event_path: str, is_directory: bool = False) -> bool:
+        """
+        放入防抖队列
+        :return: 是否入队成功
+        """
+        if not self._queue:
+            return False
+        if self._jobstore is not None:
+            self._jobstore.put(event_path, mon_path, text, is_directory)
+        if not self._queue.put(event_path, (mon_path, text, is_directory)):
+            return False
+        self._metrics.incr("queued")
+        return True
+
+    def __process_batch(self, batch: List[Tuple[str, tuple]]):
+        """
+        处理防抖队列释放的一批文件，按源目录分组后逐个提交到整理线程池，
+        同组文件全部处理完成后再统一刮削
+        :param batch: [(文件路径, (监控目录, 事件描述, 是否目录))]
+        """
+        paths = [path for path, _ in batch]
+        if self._jobstore is not None:
+            self._jobstore.set_states(paths, JobStore.STABLE)
+        # 批量查询下载历史，结果随任务传递
+        downloads = None
+        if self._downloads is not None:
+            with self._metrics.timer("download_prefetch"):
+                downloads = self._downloads.prefetch(paths)
+        scrape_batches = ScrapeBatch.group(paths)
+        for i, (path, (mon_path, text, is_directory)) in enumerate(batch):
+            scrape_batch = scrape_batches[path]
+            if not self.__submit(self.__run_job, mon_path=mon_path, text=text,
+                                 event_path=Path(path), is_directory=is_directory,
+                                 scrape_batch=scrape_batch, downloads=downloads,
+                                 on_cancel=lambda b=scrape_batch: self.__finish_scrape_batch(b)):
+                # 插件停止，未提交的文件同样计入完成，已整理的同组文件照常刮削
+                for rest, _ in batch[i:]:
+                    self.__finish_scrape_batch(scrape_batches[rest])
+                return
+
+    def __run_job(self, mon_path: str, text: str, event_path: Path, is_directory: bool, attempt: int = 0,
+                  scrape_batch: Optional[ScrapeBatch] = None, downloads: Optional[Dict[str, Any]] = None):
+        """
+        执行一个整理任务，失败时安排重试，结束后更新持久化任务状态
+        :param attempt: 第几次重试，首次执行为0
+        :param scrape_batch: 所属刮削分组，为空时整理成功后立即刮削
+        :param downloads: 所属批次预取的下载历史
+        """
+        path = str(event_path)
+        result = None
+        retry = True
+        start = time.perf_counter()
+        # 同一文件已在处理中，合并重复任务
+        owner = self._inflight.acquire(path)
+        if owner is not None:
+            logger.info(f"{path} 正在处理中（{owner}），合并重复任务")
+            self._metrics.incr("collapsed")
+            self.__finish_scrape_batch(scrape_batch)
+            # 同一路径的任务状态由正在处理的任务更新
+            if owner != path:
+                self.__set_job_state(path, JobStore.DONE)
+            return
+        try:
+            if attempt:
+                # 重试不再经过过滤和历史记录检查，文件已不存在时放弃
+                if event_path.exists():
+                    result = self.__handle_file(is_directory=is_directory, event_path=event_path,
+                                                source_dir=mon_path, storage="local", attempt=attempt)
+                else:
+                    result = None
+            else:
+                result = self.__handle_event(mon_path=mon_path, text=text, event_path=event_path,
+                                             is_directory=is_directory, scrape_batch=scrape_batch,
+                                             downloads=downloads)
+        except InterruptedError as e:
+            # 插件停止时中断的复制保留任务状态，重启后恢复并续传
+            logger.warn(f"{path} {e}")
+            return
+        except PermanentError as e:
+            logger.error(str(e))
+            result = False
+            retry = False
+        finally:
+            self._inflight.release(path)
+            self.__finish_scrape_batch(scrape_batch)
+            self._metrics.observe("total", time.perf_counter() - start)
+            self._metrics.incr({True: "processed", False: "failed"}.get(result, "skipped"))
+        if result is not False:
+            self.__set_job_state(path, JobStore.DONE)
+        elif retry and self._retry and self._retry.schedule(path, (mon_path, text, is_directory), attempt):
+            # 等待重试期间保留任务，重启后从已执行的次数继续重试
+            if self._jobstore is not None:
+                self._jobstore.set_retry(path, attempt)
+        else:
+            self.__set_job_state(path, JobStore.FAILED)
+
+    def __finish_scrape_batch(self, scrape_batch: Optional[ScrapeBatch]):
+        """
+        组内一个文件处理完成，同组最后一个文件完成时统一刮削
+        """
+        if scrape_batch is None:
+            return
+        for args in scrape_batch.done():
+            self.__post(self.__scrape, *args)
+
+    def __submit_retry(self, path: str, payload: tuple, attempt: int, on_done: Callable[[], None]) -> bool:
+        """
+        提交一次重试到整理线程池
+        """
+        mon_path, text, is_directory = payload
+        if mon_path not in self._dirconf:
+            return False
+        return self.__submit(self.__run_job, on_done=on_done, mon_path=mon_path, text=text,
+                             event_path=Path(path), is_directory=is_directory, attempt=attempt)
+
+    def __will_retry(self, attempt: int) -> bool:
+        """
+        本次失败后是否还会重试
+        """
+        return bool(self._retry and self._retry.enabled and self._retry.can_retry(attempt))
+
+    def __handle_event(self, mon_path: str, text: str, event_path: Path, is_directory: bool,
+                       scrape_batch: Optional[ScrapeBatch] = None,
+                       downloads: Optional[Dict[str, Any]] = None) -> Optional[bool]:
+        """
+        过滤并处理一个文件
+        :param mon_path: 监控目录
         :param text: 事件描述
         :param event_path: 事件文件路径
+        :param is_directory: 是否目录
+        :param scrape_batch: 所属刮削分组
+        :param downloads: 所属批次预取的下载历史
+        :return: 是否整理成功，不需要处理时返回None
         """
         # 回收站及隐藏的文件不处理
-        if (event_path.find("/@Recycle") != -1
-                or event_path.find("/#recycle") != -1
-                or event_path.find("/.") != -1
-                or event_path.find("/@eaDir") != -1):
+        event_path_str = str(event_path)
+        if self._path_filter.ignored(event_path_str):
             logger.info(f"{event_path} 是回收站或隐藏的文件，跳过处理")
             return
 
         # 不是媒体文件不处理
-        if event_path.suffix.lower() not in self.all_exts:
+        if not self._path_filter.is_media(event_path_str):
             logger.debug(f"{event_path} 不是媒体文件")
             return
         
         # 命中过滤关键字不处理
-        if self._exclude_keywords:
-            for keyword in self._exclude_keywords.split("\n"):
-                if keyword and re.findall(keyword, event_path):
-                    logger.info(f"{event_path} 命中过滤关键字 {keyword}，不处理")
-                    return
+        keyword = self._path_filter.excluded(event_path_str)
+        if keyword is not None:
+            logger.info(f"{event_path} 命中过滤关键字 {keyword}，不处理")
+            return
         storage = "local"
-        # 查询历史记录，已转移的不处理
-        if self.transferhis.get_by_src(str(event_path), storage=storage):
+        # 查询历史记录，已转移的不处理；全量同步开始时已重新加载索引，命中时不再逐个查询确认
+        if self.__is_transferred(event_path_str, storage=storage, confirm=text != "全量"):
             logger.info(f"{event_path} 已经整理过了")
             return
         
         # 文件发生变化
-        logger.debug(f"变动类型 {event.event_type} 变动路径 {event_path}")
-        self.__handle_file(is_directory=event.is_directory, event_path=event_path, source_dir=mon_path, storage=storage)
+        logger.debug(f"变动类型 {text} 变动路径 {event_path}")
+        return self.__handle_file(is_directory=is_directory, event_path=event_path, source_dir=mon_path,
+                                  storage=storage, scrape_batch=scrape_batch, downloads=downloads)
 
-    def __handle_file(self, is_directory: bool, event_path: Path, source_dir: str, storage: str):
+    def __handle_file(self, is_directory: bool, event_path: Path, source_dir: str, storage: str,
+                      attempt: int = 0, scrape_batch: Optional[ScrapeBatch] = None,
+                      downloads: Optional[Dict[str, Any]] = None) -> Optional[bool]:
         """
         同步一个文件
         :event.is_directory
         :param event_path: 事件文件路径
         :param source_dir: 监控目录
         :params storage: 存储
+        :param attempt: 第几次重试，首次执行为0
+        :param scrape_batch: 所属刮削分组，为空时立即刮削
+        :param downloads: 所属批次预取的下载历史，未预取的文件逐个查询
+        :return: 是否整理成功，文件已不存在时返回None
         """
         try:
             # 转移目标路径
             dest_dir = self._dirconf.get(source_dir)
             # 元数据
-            file_meta = MetaInfoPath(Path(event_path))
+            with self._metrics.timer("meta"):
+                file_meta = self.__parse_meta(Path(event_path))
             if not file_meta.name:
-                logger.error(f"{Path(event_path).name} 无法识别有效信息")
-                return
+                # 文件名解析结果不会变化，不重试
+                raise PermanentError(f"{Path(event_path).name} 无法识别有效信息")
             # 根据父路径获取下载历史
-            download_history = None
-            # 按文件全路径查询
-            download_file = self.downloadhis.get_file_by_fullpath(str(event_path))
-            if download_file:
-                download_history = self.downloadhis.get_by_hash(download_file.download_hash)
+            with self._metrics.timer("download_history"):
+                # 按文件全路径查询，优先使用批量预取的结果
+                if self._downloads is not None:
+                    download_history = self._downloads.get(str(event_path), prefetched=downloads)
+                else:
+                    download_file = self.downloadhis.get_file_by_fullpath(str(event_path))
+                    download_history = self.downloadhis.get_by_hash(download_file.download_hash) \
+                        if download_file else None
             # 获取下载Hash
             download_hash = None
             if download_history:
                 download_hash = download_history.download_hash
             # 识别媒体信息
-            if download_history and (download_history.tmdbid or download_history.doubanid):
-                # 下载记录中已存在识别信息
-                mediainfo: MediaInfo = self.mediaChain.recognize_media(mtype=MediaType(download_history.type),
-                                                                        tmdbid=download_history.tmdbid,
-                                                                        doubanid=download_history.doubanid, cache=True)
-            else:
-                mediainfo: MediaInfo = self.mediaChain.recognize_by_meta(file_meta)
+            self.__set_job_state(str(event_path), JobStore.RECOGNISING)
+            with self._metrics.timer("recognize"):
+                if download_history and (download_history.tmdbid or download_history.doubanid):
+                    # 下载记录中已存在识别信息
+                    with self._net_semaphore:
+                        mediainfo: MediaInfo = self.mediaChain.recognize_media(
+                            mtype=MediaType(download_history.type),
+                            tmdbid=download_history.tmdbid,
+                            doubanid=download_history.doubanid,
+                            cache=True)
+                else:
+                    mediainfo: MediaInfo = self.__recognize_by_meta(file_meta, refresh=attempt > 0)
 
             if not mediainfo:
                 logger.warn(f'未识别到媒体信息，标题：{file_meta.name}')
@@ -349,14 +1034,16 @@ class FixedTransfer(_PluginBase):
                     meta=file_meta,
                     download_hash=download_hash
                 )
-                if self._notify:
+                self.__mark_transferred(str(event_path))
+                # 还会重试时不发送失败消息
+                if self._notify and not self.__will_retry(attempt):
                     self.chain.post_message(Notification(
                         mtype=NotificationType.Manual,
                         title=f"{event_path.name} 未识别到媒体信息，无法入库！",
                         text=f"回复：```\n/redo {his.id} [tmdbid]|[类型]\n``` 手动识别转移。",
                         link=settings.MP_DOMAIN('#/history')
                     ))
-                return
+                return False
             
             # 查询转移目的目录
             dir_info = TransferDirectoryConf()
@@ -367,7 +1054,7 @@ class FixedTransfer(_PluginBase):
             dir_info.scraping = self._scraping
             dir_info.library_path = dest_dir
             dir_info.library_storage = storage
-            dir_info.transfer_type = self._transfer_type
+            dir_info.transfer_type = self._transfer_types.get(source_dir, self._transfer_type)
             dir_info.overwrite_mode = "always"
             dir_info.name = "定向整理"
 
@@ -377,28 +1064,33 @@ class FixedTransfer(_PluginBase):
                 logger.warn(f"{event_path.name} 未找到对应的文件")
                 return
             # 更新媒体图片
-            self.chain.obtain_images(mediainfo=mediainfo)
+            with self._metrics.timer("images"):
+                self.__obtain_images(mediainfo)
             # 获取集数据
             if mediainfo.type == MediaType.TV:
-                episodes_info = self.tmdbchain.tmdb_episodes(tmdbid=mediainfo.tmdb_id,season=file_meta.begin_season or 1)
+                with self._metrics.timer("episodes"):
+                    episodes_info = self.__tmdb_episodes(tmdbid=mediainfo.tmdb_id,
+                                                         season=file_meta.begin_season or 1)
             else:
                 episodes_info = None
             # 转移
-            transferinfo: TransferInfo = self.chain.transfer(fileitem=file_item,
-                                                                meta=file_meta,
-                                                                mediainfo=mediainfo,
-                                                                target_directory=dir_info,
-                                                                episodes_info=episodes_info)
+            self.__set_job_state(str(event_path), JobStore.TRANSFERRING)
+            with self.__io_slot(dir_info.transfer_type, file_item, dest_dir) as lease, \
+                    self._io_semaphore, self._metrics.timer("transfer"):
+                transferinfo: TransferInfo = self.__transfer(file_item=file_item, file_meta=file_meta,
+                                                             mediainfo=mediainfo, dir_info=dir_info,
+                                                             episodes_info=episodes_info, dest_dir=dest_dir,
+                                                             lease=lease)
 
             if not transferinfo:
                 logger.error("文件转移模块运行失败")
-                return
+                return False
             
             if not transferinfo.success:
                 # 转移失败
                 logger.warn(f"{event_path.name} 入库失败：{transferinfo.message}")
                 # 新增转移失败历史记录
-                self.transferhis.add_fail(
+                his = self.transferhis.add_fail(
                     fileitem=file_item,
                     mode=transferinfo.transfer_type if transferinfo else '',
                     download_hash=download_hash,
@@ -406,8 +1098,9 @@ class FixedTransfer(_PluginBase):
                     mediainfo=mediainfo,
                     transferinfo=transferinfo
                 )
-                # 发送失败消息
-                if self._notify:
+                self.__mark_transferred(str(event_path))
+                # 发送失败消息，还会重试时不发送
+                if self._notify and not self.__will_retry(attempt):
                     self.chain.post_message(Notification(
                         mtype=NotificationType.Manual,
                         title=f"{mediainfo.title_year} {file_meta.season_episode} 入库失败！",
@@ -415,136 +1108,338 @@ class FixedTransfer(_PluginBase):
                         image=mediainfo.get_message_image(),
                         link=settings.MP_DOMAIN('#/history')
                     ))
-                return
+                return False
             # 转移成功
             logger.info(f"{event_path.name} 入库成功：{transferinfo.target_diritem.path}")
             # 新增转移成功历史记录
-            self.transferhis.add_success(
-                fileitem=file_item,
-                mode=transferinfo.transfer_type if transferinfo else '',
-                download_hash=download_hash,
-                meta=file_meta,
-                mediainfo=mediainfo,
-                transferinfo=transferinfo
-            )
-            # 汇总刮削
+            with self._metrics.timer("history"):
+                self.transferhis.add_success(
+                    fileitem=file_item,
+                    mode=transferinfo.transfer_type if transferinfo else '',
+                    download_hash=download_hash,
+                    meta=file_meta,
+                    mediainfo=mediainfo,
+                    transferinfo=transferinfo
+                )
+            self.__mark_transferred(str(event_path))
+            # 汇总刮削，同组文件全部完成后每个目标目录只刮削一次
+            scrape_now = False
             if transferinfo.need_scrape:
-                self.mediaChain.scrape_metadata(fileitem=transferinfo.target_diritem,meta=file_meta,mediainfo=mediainfo)
-            # 发送消息汇总
-            if transferinfo.need_notify:
-                self.__collect_msg_medias(mediainfo=mediainfo, file_meta=file_meta, transferinfo=transferinfo)
-            # 移动模式删除空目录
-            if transferinfo.transfer_type in ["move"]:
-                self.storagechain.delete_media_file(file_item, delete_self=False)
+                if scrape_batch is not None:
+                    scrape_batch.defer(ScrapeBatch.key(mediainfo, file_meta.begin_season,
+                                                       str(transferinfo.target_diritem.path)),
+                                       transferinfo.target_diritem, file_meta, mediainfo)
+                else:
+                    scrape_now = True
+            # 刮削、消息汇总、删除空目录交给后处理线程池
+            self.__post(self.__post_transfer, file_item=file_item, file_meta=file_meta, mediainfo=mediainfo,
+                        transferinfo=transferinfo, scrape=scrape_now)
+            return True
 
+        except (InterruptedError, PermanentError):
+            # 插件停止或不需要重试的失败，交给任务执行方处理
+            raise
         except Exception as e:
             logger.error(f"event_handler_created error: {e}")
             print(str(e))
             traceback.print_exc()
+            return False
 
-    def __collect_msg_medias(self, mediainfo: MediaInfo, file_meta: MetaInfoPath, transferinfo: TransferInfo):
+    def __transfer(self, file_item: FileItem, file_meta: MetaInfoPath, mediainfo: MediaInfo,
+                   dir_info: TransferDirectoryConf, episodes_info: Any, dest_dir: str,
+                   lease: Optional[IoLease] = None) -> Optional[TransferInfo]:
         """
-        收集媒体处理完的消息
-        """
-        media_list = self._msg_medias.get(mediainfo.title_year + " " + file_meta.season) or {}
-        if media_list:
-            media_files = media_list.get("files") or []
-            if media_files:
-                file_exists = False
-                for file in media_files:
-                    if str(transferinfo.fileitem.path) == file.get("path"):
-                        file_exists = True
-                        break
-                if not file_exists:
-                    media_files.append({
-                        "path": str(transferinfo.fileitem.path),
-                        "mediainfo": mediainfo,
-                        "file_meta": file_meta,
-                        "transferinfo": transferinfo
-                    })
-            else:
-                media_files = [
-                    {
-                        "path": str(transferinfo.fileitem.path),
-                        "mediainfo": mediainfo,
-                        "file_meta": file_meta,
-                        "transferinfo": transferinfo
-                    }
-                ]
-            media_list = {
-                "files": media_files,
-                "time": datetime.datetime.now()
-            }
-        else:
-            media_list = {
-                "files": [
-                    {
-                        "path": str(transferinfo.fileitem.path),
-                        "mediainfo": mediainfo,
-                        "file_meta": file_meta,
-                        "transferinfo": transferinfo
-                    }
-                ],
-                "time": datetime.datetime.now()
-            }
-        self._msg_medias[mediainfo.title_year + " " + file_meta.season] = media_list
+        转移文件，本地复制时先用复制引擎复制到目标目录下的暂存文件，再硬链接到媒体库
+        :param lease: 设备调度槽位，复制引擎按块限速
+        """
+        if not self._copy_engine or dir_info.transfer_type != "copy" or file_item.storage != "local":
+            return self.chain.transfer(fileitem=file_item, meta=file_meta, mediainfo=mediainfo,
+                                       target_directory=dir_info, episodes_info=episodes_info)
+        staged = []
+        try:
+            staged = self._copy_engine.stage(Path(file_item.path), dest_dir,
+                                             throttle=lease.throttle if lease else None)
+            staged_item = self.storagechain.get_file_item(storage=file_item.storage, path=staged[0])
+            # 暂存文件与媒体库在同一文件系统，硬链接到整理后的位置
+            dir_info.transfer_type = "link"
+            try:
+                transferinfo = self.chain.transfer(fileitem=staged_item, meta=file_meta, mediainfo=mediainfo,
+                                                   target_directory=dir_info, episodes_info=episodes_info)
+            finally:
+                dir_info.transfer_type = "copy"
+            if transferinfo and transferinfo.success:
+                # 历史记录和消息中仍使用源文件及复制方式
+                transferinfo.fileitem = file_item
+                transferinfo.transfer_type = "copy"
+                return transferinfo
+            logger.warn(f"{file_item.name} 暂存文件链接失败："
+                        f"{transferinfo.message if transferinfo else '未知'}，改为直接复制")
+        except InterruptedError:
+            raise
+        except Exception as e:
+            logger.warn(f"{file_item.name} 复制引擎出错：{e}，改为直接复制")
+        finally:
+            self._copy_engine.cleanup(staged)
+        return self.chain.transfer(fileitem=file_item, meta=file_meta, mediainfo=mediainfo,
+                                   target_directory=dir_info, episodes_info=episodes_info)
+
+    def __io_slot(self, transfer_type: str, file_item: FileItem, dest_dir: str):
+        """
+        复制类转移按源文件和目标目录所在设备排队，其余方式不限制
+        """
+        if transfer_type not in ("copy", "rclone_copy", "rclone_move") or not self._io_scheduler:
+            return contextlib.nullcontext()
+        return self._io_scheduler.slot(paths=[file_item.path, dest_dir], size=file_item.size or 0)
+
+    def __scrape(self, fileitem: FileItem, meta: Any, mediainfo: MediaInfo):
+        """
+        刮削目标目录，在后处理线程池中执行，并发由线程池限制，不占用识别的网络并发数
+        """
+        try:
+            with self._metrics.timer("scrape"):
+                self.mediaChain.scrape_metadata(fileitem=fileitem, meta=meta, mediainfo=mediainfo)
+        except Exception as e:
+            logger.error(f"刮削 {fileitem.path} 出错：{e}")
+
+    def __post_transfer(self, file_item: FileItem, file_meta: MetaInfoPath, mediainfo: MediaInfo,
+                        transferinfo: TransferInfo, scrape: bool):
+        """
+        转移成功后的处理：刮削、收集消息、移动模式删除空目录
+        """
+        if scrape:
+            self.__scrape(transferinfo.target_diritem, file_meta, mediainfo)
+        # 发送消息汇总
+        if transferinfo.need_notify:
+            with self._metrics.timer("notify"):
+                self.__collect_msg_medias(mediainfo=mediainfo, file_meta=file_meta, transferinfo=transferinfo)
+        # 移动模式删除空目录
+        if transferinfo.transfer_type in ["move"]:
+            try:
+                self.storagechain.delete_media_file(file_item, delete_self=False)
+            except Exception as e:
+                logger.error(f"删除 {file_item.path} 空目录出错：{e}")
+
+    @staticmethod
+    def __lower_priority():
+        """
+        后处理线程降低调度优先级，只对当前线程生效（Linux）
+        """
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except (AttributeError, OSError):
+            pass
 
-    def __send_msg(self):
+    def __post(self, fn: Callable, *args, **kwargs):
         """
-        定时检查是否有媒体处理完，发送统一消息
+        提交到后处理线程池，积压过多时阻塞，线程池未启动时直接执行
+        插件停止过程中仍提交到线程池，由线程池停止前执行完
         """
-        if not self._msg_medias or not self._msg_medias.keys():
+        if not self._post_executor:
+            fn(*args, **kwargs)
             return
+        self._post_slots.acquire()
+        with self._pending_lock:
+            self._post_pending += 1
+        try:
+            self._post_executor.submit(self.__run_post, fn, *args, **kwargs)
+        except RuntimeError:
+            # 线程池已关闭
+            self.__post_done()
+            fn(*args, **kwargs)
 
-        # 遍历检查是否已刮削完，发送消息
-        for medis_title_year_season in list(self._msg_medias.keys()):
-            media_list = self._msg_medias.get(medis_title_year_season)
-            logger.info(f"开始处理媒体 {medis_title_year_season} 消息")
+    def __run_post(self, fn: Callable, *args, **kwargs):
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"后处理出错：{e}")
+        finally:
+            self.__post_done()
 
-            if not media_list:
-                continue
+    def __post_done(self):
+        with self._pending_lock:
+            self._post_pending -= 1
+        self._post_slots.release()
 
-            # 获取最后更新时间
-            last_update_time = media_list.get("time")
-            media_files = media_list.get("files")
-            if not last_update_time or not media_files:
-                continue
+    @staticmethod
+    def __list_transferred_src(storage: str) -> List[str]:
+        """
+        一次查询出所有已整理的源路径
+        """
+        db = ScopedSession()
+        try:
+            return [src for src, in db.query(TransferHistory.src).filter(TransferHistory.src_storage == storage)]
+        finally:
+            db.close()
 
-            transferinfo = media_files[0].get("transferinfo")
-            file_meta = media_files[0].get("file_meta")
-            mediainfo = media_files[0].get("mediainfo")
-            # 判断剧集最后更新时间距现在是已超过10秒或者电影，发送消息
-            if (datetime.datetime.now() - last_update_time).total_seconds() > int(self._interval) or mediainfo.type == MediaType.MOVIE:
-                # 汇总处理文件总大小
-                total_size = 0
-                file_count = 0
-
-                # 剧集汇总
-                episodes = []
-                for file in media_files:
-                    transferinfo = file.get("transferinfo")
-                    total_size += transferinfo.total_size
-                    file_count += 1
-
-                    file_meta = file.get("file_meta")
-                    if file_meta and file_meta.begin_episode:
-                        episodes.append(file_meta.begin_episode)
-
-                transferinfo.total_size = total_size
-                # 汇总处理文件数量
-                transferinfo.file_count = file_count
-
-                # 剧集季集信息 S01 E01-E04 || S01 E01、E02、E04
-                season_episode = None
-                # 处理文件多，说明是剧集，显示季入库消息
-                if mediainfo.type == MediaType.TV:
-                    # 季集文本
-                    season_episode = f"{file_meta.season} {StringUtils.format_ep(episodes)}"
-                # 发送消息
-                self.transferchain.send_transfer_message(meta=file_meta,mediainfo=mediainfo,transferinfo=transferinfo,season_episode=season_episode)
-                # 发送完消息，移出key
-                del self._msg_medias[medis_title_year_season]
-                continue
+    @staticmethod
+    def __load_download_history(paths: List[str]) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """
+        批量查询文件的下载记录，分段查询避免超出数据库参数个数限制
+        :return: (文件路径 -> 种子Hash, 种子Hash -> 下载历史)，同一文件或种子有多条记录时取最新的
+        """
+        chunk = 500
+        hashes: Dict[str, str] = {}
+        histories: Dict[str, Any] = {}
+        db = ScopedSession()
+        try:
+            for i in range(0, len(paths), chunk):
+                rows = db.query(DownloadFiles.fullpath, DownloadFiles.download_hash) \
+                    .filter(DownloadFiles.fullpath.in_(paths[i:i + chunk])) \
+                    .order_by(DownloadFiles.id.desc())
+                for fullpath, download_hash in rows:
+                    if download_hash:
+                        hashes.setdefault(fullpath, download_hash)
+            download_hashes = list(set(hashes.values()))
+            for i in range(0, len(download_hashes), chunk):
+                rows = db.query(DownloadHistory) \
+                    .filter(DownloadHistory.download_hash.in_(download_hashes[i:i + chunk])) \
+                    .order_by(DownloadHistory.date.desc())
+                for history in rows:
+                    histories.setdefault(history.download_hash, history)
+        finally:
+            db.close()
+        return hashes, histories
+
+    def __get_download_hash(self, path: str) -> Optional[str]:
+        """
+        单个文件的种子Hash
+        """
+        download_file = self.downloadhis.get_file_by_fullpath(path)
+        return download_file.download_hash if download_file else None
+
+    def __is_transferred(self, path: str, storage: str, confirm: bool = True) -> bool:
+        """
+        源文件是否已整理过
+        :param confirm: 索引命中时是否查询数据库确认
+        """
+        if self._transferred is None:
+            return bool(self.transferhis.get_by_src(path, storage=storage))
+        return self._transferred.contains(path, confirm=confirm)
+
+    def __mark_transferred(self, path: str):
+        """
+        新增历史记录后同步更新索引
+        """
+        if self._transferred is not None:
+            self._transferred.add(path)
+
+    @staticmethod
+    def __recognize_key(file_meta: MetaInfoPath) -> tuple:
+        """
+        识别缓存的键：规范化的名称、年份、类型、季
+        """
+        name = re.sub(r"\s+", " ", str(file_meta.name or "")).strip().lower()
+        mtype = file_meta.type.value if isinstance(file_meta.type, MediaType) else str(file_meta.type or "")
+        return name, str(file_meta.year or ""), mtype, file_meta.begin_season
+
+    def __recognize_by_meta(self, file_meta: MetaInfoPath, refresh: bool = False) -> Optional[MediaInfo]:
+        """
+        根据元数据识别媒体信息，相同名称、年份、类型、季的文件共用识别结果，未识别的结果也会短暂缓存
+        :param refresh: 忽略已缓存的结果重新识别（重试时使用）
+        """
+
+        def __load():
+            with self._net_semaphore:
+                return self.mediaChain.recognize_by_meta(file_meta)
+
+        if self._recognize_cache is None:
+            return __load()
+        key = self.__recognize_key(file_meta)
+        if refresh:
+            self._recognize_cache.invalidate(key)
+        return self._recognize_cache.get_or_load(key, __load)
+
+    def __tmdb_episodes(self, tmdbid: int, season: int) -> Optional[list]:
+        """
+        获取季的集信息，按 (tmdbid, 季) 缓存
+        """
+
+        def __load():
+            with self._net_semaphore:
+                return self.tmdbchain.tmdb_episodes(tmdbid=tmdbid, season=season)
+
+        if self._episodes_cache is None or not tmdbid:
+            return __load()
+        return self._episodes_cache.get_or_load((tmdbid, season), __load)
+
+    def __obtain_images(self, mediainfo: MediaInfo):
+        """
+        补充媒体图片，按tmdbid缓存，命中时直接复制已获取的图片地址
+        """
+
+        def __load():
+            with self._net_semaphore:
+                return self.chain.obtain_images(mediainfo=mediainfo) or mediainfo
+
+        if self._images_cache is None or not mediainfo.tmdb_id:
+            __load()
+            return
+        cached = self._images_cache.get_or_load(mediainfo.tmdb_id, __load)
+        if cached is mediainfo:
+            return
+        for attr in ("poster_path", "backdrop_path", "logo_path"):
+            value = getattr(cached, attr, None)
+            if value and hasattr(mediainfo, attr):
+                setattr(mediainfo, attr, value)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        API: 缓存命中统计
+        """
+        return {
+            name: cache.stats() if cache is not None else {}
+            for name, cache in (("meta", self._meta_cache),
+                                ("recognize", self._recognize_cache),
+                                ("episodes", self._episodes_cache),
+                                ("images", self._images_cache),
+                                ("downloads", self._downloads))
+        }
+
+    def __collect_msg_medias(self, mediainfo: MediaInfo, file_meta: MetaInfoPath, transferinfo: TransferInfo):
+        """
+        收集媒体处理完的消息，电影立即发送，剧集在同一季最后一个文件入库后等待设定的秒数再汇总发送
+        """
+        if not self._aggregator:
+            return
+        self._aggregator.add(key=mediainfo.title_year + " " + file_meta.season,
+                             path=str(transferinfo.fileitem.path),
+                             record=FileRecord(size=transferinfo.total_size or 0, episode=file_meta.begin_episode),
+                             context=(mediainfo, file_meta, transferinfo),
+                             immediately=mediainfo.type == MediaType.MOVIE)
+
+    def __send_msg(self, group: MessageGroup):
+        """
+        发送一组媒体的汇总消息
+        """
+        if not group.files or not group.context:
+            return
+        mediainfo, file_meta, transferinfo = group.context
+        # 汇总处理文件总大小
+        total_size = 0
+        file_count = 0
+
+        # 剧集汇总
+        episodes = []
+        for record in group.files.values():
+            total_size += record.size
+            file_count += 1
+            if record.episode:
+                episodes.append(record.episode)
+
+        transferinfo.total_size = total_size
+        # 汇总处理文件数量
+        transferinfo.file_count = file_count
+
+        # 剧集季集信息 S01 E01-E04 || S01 E01、E02、E04
+        season_episode = None
+        # 处理文件多，说明是剧集，显示季入库消息
+        if mediainfo.type == MediaType.TV:
+            # 季集文本
+            season_episode = f"{file_meta.season} {StringUtils.format_ep(episodes)}"
+        # 发送消息
+        with self._metrics.timer("message"):
+            self.transferchain.send_transfer_message(meta=file_meta, mediainfo=mediainfo, transferinfo=transferinfo,
+                                                     season_episode=season_episode)
 
     def __update_config(self):
         """
@@ -554,11 +1449,31 @@ class FixedTransfer(_PluginBase):
             "enabled": self._enabled,
             "exclude_keywords": self._exclude_keywords,
             "transfer_type": self._transfer_type,
+            "auto_transfer": self._auto_transfer,
+            "copy_engine": self._copy_engine_enabled,
             "onlyonce": self._onlyonce,
             "interval": self._interval,
             "notify": self._notify,
             "monitor_confs": self._monitor_confs,
             "scraping": self._scraping,
+            "debounce": self._debounce,
+            "queue_size": self._queue_size,
+            "max_workers": self._max_workers,
+            "net_concurrency": self._net_concurrency,
+            "io_concurrency": self._io_concurrency,
+            "io_per_device": self._io_per_device,
+            "io_bandwidth": self._io_bandwidth,
+            "post_concurrency": self._post_concurrency,
+            "stable_seconds": self._stable_seconds,
+            "scan_workers": self._scan_workers,
+            "poll_min_interval": self._poll_min_interval,
+            "poll_max_interval": self._poll_max_interval,
+            "watch_budget": self._watch_budget,
+            "retry_times": self._retry_times,
+            "retry_delay": self._retry_delay,
+            "retry_concurrency": self._retry_concurrency,
+            "cache_ttl": self._cache_ttl,
+            "cache_size": self._cache_size,
         })
 
     def get_state(self) -> bool:
@@ -569,7 +1484,65 @@ class FixedTransfer(_PluginBase):
         pass
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        """
+        获取插件API
+        [{
+            "path": "/xx",
+            "endpoint": self.xxx,
+            "methods": ["GET", "POST"],
+            "summary": "API说明"
+        }]
+        """
+        return [
+            {
+                "path": "/cache_stats",
+                "endpoint": self.cache_stats,
+                "methods": ["GET"],
+                "auth": "bear",
+                "summary": "缓存统计",
+                "description": "识别、剧集、图片缓存的命中情况"
+            },
+            {
+                "path": "/watch_stats",
+                "endpoint": self.watch_stats,
+                "methods": ["GET"],
+                "auth": "bear",
+                "summary": "监控状态",
+                "description": "inotify 监控预算使用情况及轮询目录"
+            },
+            {
+                "path": "/metrics",
+                "endpoint": self.metrics_stats,
+                "methods": ["GET"],
+                "auth": "bear",
+                "summary": "性能统计",
+                "description": "各阶段耗时分位数、处理计数及当前积压"
+            },
+            {
+                "path": "/transfer_stats",
+                "endpoint": self.transfer_stats,
+                "methods": ["GET"],
+                "auth": "bear",
+                "summary": "整理方式",
+                "description": "各目录对的硬链接、reflink 探测结果及实际使用的整理方式"
+            },
+            {
+                "path": "/copy_progress",
+                "endpoint": self.copy_progress,
+                "methods": ["GET"],
+                "auth": "bear",
+                "summary": "复制进度",
+                "description": "复制引擎正在复制及最近完成的文件进度和速度"
+            },
+            {
+                "path": "/job_stats",
+                "endpoint": self.job_stats,
+                "methods": ["GET"],
+                "auth": "bear",
+                "summary": "任务队列",
+                "description": "持久化任务队列中各状态的任务数"
+            }
+        ]
 
     def get_form(self) -> Tuple[List[dict], Dict[str, Any]]:
         """
@@ -655,7 +1628,7 @@ class FixedTransfer(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 6
+                                    'md': 4
                                 },
                                 'content': [
                                     {
@@ -679,7 +1652,24 @@ class FixedTransfer(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 6
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'auto_transfer',
+                                            'label': '自动选择整理方式',
+                                            'hint': '复制和硬链接模式下，按目录对探测，能硬链接时硬链接，否则复制'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
                                 },
                                 'content': [
                                     {
@@ -694,6 +1684,362 @@ class FixedTransfer(_PluginBase):
                             }
                         ]
                     },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'debounce',
+                                            'label': '事件防抖（秒）',
+                                            'placeholder': '3'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'queue_size',
+                                            'label': '事件队列容量',
+                                            'placeholder': '10000'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'stable_seconds',
+                                            'label': '文件稳定时间（秒）',
+                                            'placeholder': '5'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'max_workers',
+                                            'label': '并发整理数',
+                                            'placeholder': '4'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'net_concurrency',
+                                            'label': '网络并发数',
+                                            'placeholder': '4'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'io_concurrency',
+                                            'label': '转移并发数',
+                                            'placeholder': '2'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'copy_engine',
+                                            'label': '内置复制引擎',
+                                            'hint': '本地复制时分块零拷贝复制，支持进度查询和中断续传'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'io_per_device',
+                                            'label': '每块磁盘复制并发数',
+                                            'placeholder': '1',
+                                            'hint': '复制和Rclone模式下，同一块磁盘同时复制的文件数'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'io_bandwidth',
+                                            'label': '复制限速（MB/s）',
+                                            'placeholder': '0',
+                                            'hint': '0为不限速，仅对复制引擎生效，Rclone请在其配置中设置 --bwlimit'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'post_concurrency',
+                                            'label': '刮削通知并发数',
+                                            'placeholder': '2',
+                                            'hint': '刮削、消息、清理空目录在单独的低优先级线程中执行'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'cache_ttl',
+                                            'label': '缓存时间（秒）',
+                                            'placeholder': '3600'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'cache_size',
+                                            'label': '缓存条数',
+                                            'placeholder': '1024'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'scan_workers',
+                                            'label': '扫描线程数',
+                                            'placeholder': '4'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'poll_min_interval',
+                                            'label': '轮询最小间隔（秒）',
+                                            'placeholder': '10'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'poll_max_interval',
+                                            'label': '轮询最大间隔（秒）',
+                                            'placeholder': '300'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'watch_budget',
+                                            'label': 'inotify监控预算',
+                                            'placeholder': '0为自动'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'retry_times',
+                                            'label': '失败重试次数',
+                                            'placeholder': '3'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'retry_delay',
+                                            'label': '首次重试延迟（秒）',
+                                            'placeholder': '60'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'retry_concurrency',
+                                            'label': '重试并发数',
+                                            'placeholder': '2'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
                     {
                         'component': 'VRow',
                         'content': [
@@ -790,17 +2136,136 @@ class FixedTransfer(_PluginBase):
             "monitor_confs": "",
             "exclude_keywords": "",
             "transfer_type": "link",
-            "scraping": False
+            "auto_transfer": False,
+            "copy_engine": False,
+            "scraping": False,
+            "debounce": 3,
+            "queue_size": 10000,
+            "max_workers": 4,
+            "net_concurrency": 4,
+            "io_concurrency": 2,
+            "io_per_device": 1,
+            "io_bandwidth": 0,
+            "post_concurrency": 2,
+            "stable_seconds": 5,
+            "scan_workers": 4,
+            "poll_min_interval": 10,
+            "poll_max_interval": 300,
+            "watch_budget": 0,
+            "retry_times": 3,
+            "retry_delay": 60,
+            "retry_concurrency": 2,
+            "cache_ttl": 3600,
+            "cache_size": 1024
         }
 
     def get_page(self) -> List[dict]:
-        pass
+        """
+        插件详情页面：处理计数、当前积压及各阶段耗时
+        """
+        stats = self.metrics_stats()
+        counters = stats.get("counters") or {}
+        backlog = stats.get("backlog") or {}
+
+        def stat_col(title: str, value: Any, icon: str, color: str) -> dict:
+            return {'component': 'VCol', 'props': {'cols': 6, 'md': 3}, 'content': [
+                {'component': 'div', 'props': {'class': 'd-flex align-center'}, 'content': [
+                    {'component': 'VIcon', 'props': {'start': True, 'icon': icon, 'color': color}},
+                    {'component': 'span', 'text': f"{title}: {value}"}
+                ]}
+            ]}
+
+        summary_card = {
+            'component': 'VCard',
+            'props': {'variant': 'outlined', 'class': 'mb-4'},
+            'content': [
+                {'component': 'VCardTitle', 'props': {'class': 'text-h6'}, 'text': '处理统计'},
+                {'component': 'VCardText', 'content': [
+                    {'component': 'VRow', 'props': {'dense': True}, 'content': [
+                        stat_col('入队', counters.get('queued', 0), 'mdi-tray-arrow-down', 'primary'),
+                        stat_col('成功', counters.get('processed', 0), 'mdi-check-circle', 'success'),
+                        stat_col('跳过', counters.get('skipped', 0), 'mdi-skip-next-circle', 'grey'),
+                        stat_col('失败', counters.get('failed', 0), 'mdi-alert-circle', 'error'),
+                        stat_col('合并', counters.get('collapsed', 0), 'mdi-call-merge', 'grey'),
+                        stat_col('处理中', backlog.get('inflight', 0), 'mdi-progress-clock', 'info'),
+                        stat_col('防抖队列', backlog.get('debounce', 0), 'mdi-timer-sand', 'info'),
+                        stat_col('稳定检测', backlog.get('stability', 0), 'mdi-scale-balance', 'info'),
+                        stat_col('整理中', backlog.get('executor', 0), 'mdi-cog-sync', 'info'),
+                        stat_col('等待重试', backlog.get('retry', 0), 'mdi-restart', 'warning'),
+                    ]}
+                ]}
+            ]
+        }
+
+        stage_names = {
+            "meta": "元数据解析",
+            "download_prefetch": "下载历史预取",
+            "download_history": "下载历史",
+            "recognize": "识别媒体",
+            "images": "媒体图片",
+            "episodes": "剧集信息",
+            "transfer": "转移",
+            "history": "整理记录",
+            "scrape": "刮削",
+            "notify": "消息收集",
+            "message": "消息发送",
+            "total": "单文件总耗时"
+        }
+        stages = stats.get("stages") or {}
+        stage_rows = []
+        for name, title in stage_names.items():
+            stage = stages.get(name)
+            if not stage:
+                continue
+            stage_rows.append({
+                'component': 'tr',
+                'content': [
+                    {'component': 'td', 'text': title},
+                    {'component': 'td', 'text': str(stage.get('count'))},
+                    {'component': 'td', 'text': str(stage.get('avg'))},
+                    {'component': 'td', 'text': str(stage.get('p50'))},
+                    {'component': 'td', 'text': str(stage.get('p95'))},
+                    {'component': 'td', 'text': str(stage.get('p99'))},
+                    {'component': 'td', 'text': str(stage.get('max'))}
+                ]
+            })
+        if not stage_rows:
+            return [summary_card, {
+                'component': 'VAlert',
+                'props': {'type': 'info', 'variant': 'tonal', 'text': '暂无耗时数据'}
+            }]
+        stage_card = {
+            'component': 'VCard',
+            'props': {'variant': 'outlined'},
+            'content': [
+                {'component': 'VCardTitle', 'props': {'class': 'text-h6'}, 'text': '各阶段耗时（毫秒）'},
+                {'component': 'VTable', 'props': {'hover': True, 'density': 'compact'}, 'content': [
+                    {'component': 'thead', 'content': [{
+                        'component': 'tr',
+                        'content': [
+                            {'component': 'th', 'text': '阶段'},
+                            {'component': 'th', 'text': '次数'},
+                            {'component': 'th', 'text': '平均'},
+                            {'component': 'th', 'text': 'P50'},
+                            {'component': 'th', 'text': 'P95'},
+                            {'component': 'th', 'text': 'P99'},
+                            {'component': 'th', 'text': '最大'}
+                        ]
+                    }]},
+                    {'component': 'tbody', 'content': stage_rows}
+                ]}
+            ]
+        }
+        return [summary_card, stage_card]
 
     def stop_service(self):
         """
         退出插件
         """
         self._event.set()
+        if self._retry:
+            self._retry.stop()
+            self._retry = None
         if self._observers:
             for observer in self._observers:
                 try:
@@ -811,6 +2276,40 @@ class FixedTransfer(_PluginBase):
                 except Exception as e:
                     logger.error(f"停止目录监控服务出现了错误：{e}")
             self._observers = []
+        self._observer = None
+        if self._poller:
+            logger.info(f"正在停止轮询监控服务：{self._poller}...")
+            self._poller.stop()
+            self._poller.join()
+            self._poller = None
+        # 先停止稳定检测，唤醒可能阻塞在添加文件上的队列分发线程
+        if self._gate:
+            self._gate.stop()
+            self._gate = None
+        if self._queue:
+            self._queue.stop()
+            self._queue = None
+        if self._executor:
+            # 取消的任务在回调中计入刮削分组，已整理的同组文件的刮削在后处理线程池停止前执行
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        # 整理线程池停止后不再产生新的后处理任务，已提交的刮削、消息、清理全部执行完，
+        # 对应的任务已标记完成，取消后不会再恢复
+        if self._post_executor:
+            self._post_executor.shutdown(wait=True)
+            self._post_executor = None
+        self._post_pending = 0
+        if self._jobstore is not None:
+            self._jobstore.close()
+            self._jobstore = None
+        if self._aggregator:
+            # 重新配置时保留未发送的消息，由新的汇总服务继续发送
+            self._msg_groups = self._aggregator.stop()
+            self._aggregator = None
+        for cache in (self._meta_cache, self._recognize_cache, self._episodes_cache, self._images_cache,
+                      self._downloads):
+            if cache is not None:
+                cache.clear()
         if self._scheduler:
             self._scheduler.remove_all_jobs()
             if self._scheduler.running:
@@ -0,0 +1,60 @@
+import os
+import threading
+from typing import Any, Dict, Hashable, List, Tuple
+
+
+class ScrapeBatch:
+    """
+    同一批次中同一源目录下的文件（一般为同一剧集的一季）
+    文件整理成功后只登记刮削，同组最后一个文件处理完成时，每个目标目录只刮削一次
+    """
+    __slots__ = ("_remaining", "_scrapes", "_lock")
+
+    def __init__(self, count: int):
+        """
+        :param count: 组内文件数
+        """
+        self._remaining = count
+        # (媒体, 季, 目标目录) -> 刮削参数
+        self._scrapes: Dict[Hashable, tuple] = {}
+        self._lock = threading.Lock()
+
+    def defer(self, key: Hashable, *args):
+        """
+        登记一次刮削，同一键只保留第一次
+        """
+        with self._lock:
+            self._scrapes.setdefault(key, args)
+
+    def done(self) -> List[tuple]:
+        """
+        组内一个文件处理完成（无论成功与否）
+        :return: 最后一个文件完成时返回需要执行的刮削参数，否则为空
+        """
+        with self._lock:
+            self._remaining -= 1
+            if self._remaining > 0:
+                return []
+            scrapes = list(self._scrapes.values())
+            self._scrapes.clear()
+            return scrapes
+
+    @staticmethod
+    def group(paths: List[str]) -> Dict[str, "ScrapeBatch"]:
+        """
+        按源目录分组
+        :return: 文件路径 -> 所属分组
+        """
+        counts: Dict[str, int] = {}
+        for path in paths:
+            parent = os.path.dirname(path)
+            counts[parent] = counts.get(parent, 0) + 1
+        batches = {parent: ScrapeBatch(count) for parent, count in counts.items()}
+        return {path: batches[os.path.dirname(path)] for path in paths}
+
+    @staticmethod
+    def key(mediainfo: Any, season: Any, target: str) -> Tuple:
+        """
+        刮削去重键：媒体、季、目标目录
+        """
+        return mediainfo.tmdb_id or mediainfo.title_year, season, target
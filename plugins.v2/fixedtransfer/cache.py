@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    线程安全的LRU+TTL缓存
+    支持否定缓存（加载结果为空时使用较短的有效期），
+    同一个键并发加载时只有一个线程真正执行加载，其它线程等待结果
+    """
+
+    # 未命中标记
+    MISSING = object()
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 3600, negative_ttl: Optional[float] = None):
+        """
+        :param maxsize: 最大缓存条数，超出时淘汰最久未使用的条目
+        :param ttl: 有效期（秒），为None时永不过期
+        :param negative_ttl: 空结果的有效期（秒），为None时与ttl相同，为0时不缓存空结果
+        """
+        self._maxsize = max(int(maxsize), 1)
+        self._ttl = ttl
+        self._negative_ttl = ttl if negative_ttl is None else negative_ttl
+        # 键 -> (过期时间, 值)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 正在加载的键 -> 完成事件
+        self._loading: Dict[Hashable, threading.Event] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """
+        读取缓存，未命中或已过期返回default
+        """
+        with self._lock:
+            value = self.__get(key)
+            if value is self.MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = MISSING):
+        """
+        写入缓存
+        :param ttl: 本条目的有效期，默认按值是否为空选择ttl或negative_ttl
+        """
+        if ttl is self.MISSING:
+            ttl = self._negative_ttl if value is None else self._ttl
+        if ttl is not None and ttl <= 0:
+            return
+        expire = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expire, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        读取缓存，未命中时调用loader加载并写入缓存，同一个键的并发加载会合并为一次
+        """
+        while True:
+            with self._lock:
+                value = self.__get(key)
+                if value is not self.MISSING:
+                    self.hits += 1
+                    return value
+                event = self._loading.get(key)
+                if event is None:
+                    self.misses += 1
+                    event = self._loading[key] = threading.Event()
+                    break
+            # 其它线程正在加载，等待完成后重新读取
+            event.wait()
+        try:
+            value = loader()
+            self.set(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            event.set()
+
+    def invalidate(self, key: Hashable):
+        """
+        删除一个键
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        清空缓存
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        缓存统计信息
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self._maxsize,
+                "ttl": self._ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def __get(self, key: Hashable) -> Any:
+        """
+        读取缓存并处理过期和LRU顺序，调用方需持有锁
+        """
+        item = self._data.get(key)
+        if item is None:
+            return self.MISSING
+        expire, value = item
+        if expire is not None and expire <= time.monotonic():
+            del self._data[key]
+            return self.MISSING
+        self._data.move_to_end(key)
+        return value
@@ -0,0 +1,266 @@
+import errno
+import glob
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.log import logger
+
+from .fsprobe import reflink
+
+# 暂存目录名，以点开头，不会被媒体库扫描
+STAGING_DIR = ".fixedtransfer-staging"
+# 未完成的暂存文件后缀
+PART_SUFFIX = ".part"
+# 断点信息后缀，记录源文件大小和修改时间，源文件变化后不续传
+RESUME_SUFFIX = ".resume"
+
+
+class CopyProgress:
+    """
+    一个文件的复制进度
+    """
+    __slots__ = ("src", "total", "copied", "resumed", "started", "finished")
+
+    def __init__(self, src: str, total: int, resumed: int = 0):
+        self.src = src
+        self.total = total
+        self.copied = resumed
+        self.resumed = resumed
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return {
+            "path": self.src,
+            "total": self.total,
+            "copied": self.copied,
+            "percent": round(self.copied * 100 / self.total, 1) if self.total else 100,
+            "speed": round((self.copied - self.resumed) / elapsed / 1024 / 1024, 1) if elapsed > 0 else 0,
+            "finished": self.finished is not None
+        }
+
+
+class CopyEngine:
+    """
+    本地复制引擎
+    先尝试 reflink，不支持时用 copy_file_range 分块复制（数据不经过Python缓冲区），
+    再退回 sendfile 和普通读写；复制到目标目录下的暂存文件，中断后源文件未变化时从已复制的位置续传
+    """
+
+    # 每块大小
+    CHUNK_SIZE = 64 * 1024 * 1024
+    # 普通读写每次读取的大小
+    READ_SIZE = 8 * 1024 * 1024
+    # 进度保留的已完成文件数
+    KEEP_FINISHED = 20
+    # 暂存文件最长保留时间（秒），超过后即使任务未完成也删除
+    STAGING_KEEP_SECONDS = 3 * 24 * 3600
+
+    def __init__(self, extensions: Iterable[str] = (), stopped: Optional[threading.Event] = None,
+                 chunk_size: int = CHUNK_SIZE):
+        """
+        :param extensions: 媒体文件后缀，暂存附属文件时不包含其它媒体文件
+        :param stopped: 退出事件，设置后在当前块结束时中断，保留暂存文件用于续传
+        :param chunk_size: 每块大小（字节）
+        """
+        self._exts = {ext.lower() for ext in extensions}
+        self._stopped = stopped
+        self._chunk_size = max(int(chunk_size), 1024 * 1024)
+        self._progress: Dict[str, CopyProgress] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def staging_path(src: Path, target_root: str) -> Path:
+        """
+        源文件在目标目录下的暂存路径，保留原文件名，按源目录区分同名文件
+        """
+        folder = hashlib.md5(str(src.parent).encode("utf-8")).hexdigest()[:16]
+        return Path(target_root) / STAGING_DIR / folder / src.name
+
+    def stage(self, src: Path, target_root: str, throttle: Optional[Callable[[int], None]] = None) -> List[Path]:
+        """
+        复制文件及同名的字幕等附属文件到暂存目录
+        :param throttle: 限速，每复制一块调用一次，参数为字节数
+        :return: 暂存的文件，第一个为主文件
+        """
+        dst = self.staging_path(src, target_root)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        self.copy(src, dst, throttle=throttle)
+        staged = [dst]
+        # 同名附属文件（字幕、音轨等）一起暂存，整理时随主文件一起转移
+        for sibling in src.parent.glob(f"{glob.escape(src.stem)}.*"):
+            if sibling == src or sibling.suffix.lower() in self._exts or not sibling.is_file():
+                continue
+            try:
+                self.copy(sibling, dst.parent / sibling.name, track=False, throttle=throttle)
+                staged.append(dst.parent / sibling.name)
+            except OSError as e:
+                logger.warn(f"暂存附属文件 {sibling} 失败：{e}")
+        return staged
+
+    @staticmethod
+    def cleanup(staged: List[Path]):
+        """
+        删除暂存的文件，暂存目录为空时一并删除
+        """
+        for file in staged:
+            try:
+                file.unlink()
+            except OSError:
+                pass
+        if staged:
+            try:
+                staged[0].parent.rmdir()
+                staged[0].parent.parent.rmdir()
+            except OSError:
+                pass
+
+    @classmethod
+    def sweep(cls, target_root: str, keep: Iterable[Path] = (), max_age: float = STAGING_KEEP_SECONDS) -> int:
+        """
+        清理目标目录下遗留的暂存文件：不属于未完成任务的，或超过保留时间的
+        :param keep: 需要续传的暂存路径（staging_path 的结果）
+        :param max_age: 最长保留时间（秒）
+        :return: 删除的文件数
+        """
+        root = Path(target_root) / STAGING_DIR
+        if not root.is_dir():
+            return 0
+        # 暂存目录 -> 需要保留的文件名前缀（主文件及同名附属文件）
+        keep_prefixes: Dict[Path, List[str]] = {}
+        for path in keep:
+            keep_prefixes.setdefault(path.parent, []).append(f"{path.stem}.")
+        expire = time.time() - max_age
+        removed = 0
+        for folder in root.iterdir():
+            if not folder.is_dir():
+                continue
+            for file in folder.iterdir():
+                try:
+                    if file.name.startswith(tuple(keep_prefixes.get(folder, ()))) \
+                            and file.stat().st_mtime >= expire:
+                        continue
+                    file.unlink()
+                    removed += 1
+                except OSError as e:
+                    logger.warn(f"删除暂存文件 {file} 失败：{e}")
+            try:
+                folder.rmdir()
+            except OSError:
+                pass
+        try:
+            root.rmdir()
+        except OSError:
+            pass
+        return removed
+
+    def copy(self, src: Path, dst: Path, track: bool = True, throttle: Optional[Callable[[int], None]] = None):
+        """
+        复制一个文件，完成后保留修改时间等属性
+        :param track: 是否记录进度
+        :param throttle: 限速，每复制一块调用一次，reflink 不复制数据不限速
+        """
+        st = os.stat(src)
+        part = dst.with_name(dst.name + PART_SUFFIX)
+        resume_file = dst.with_name(dst.name + RESUME_SUFFIX)
+        signature = {"size": st.st_size, "mtime": st.st_mtime_ns}
+        offset = self.__resume_offset(part, resume_file, signature)
+        if not offset:
+            resume_file.write_text(json.dumps(signature))
+        progress = CopyProgress(src=str(src), total=st.st_size, resumed=offset)
+        if track:
+            with self._lock:
+                self._progress[str(src)] = progress
+        if offset:
+            logger.info(f"{src} 从 {offset} 字节处续传")
+        try:
+            with open(src, "rb") as fsrc, open(part, "r+b" if offset else "wb") as fdst:
+                if offset or not reflink(fsrc.fileno(), fdst.fileno()):
+                    self.__copy_range(fsrc.fileno(), fdst.fileno(), offset, st.st_size, progress, throttle)
+                progress.copied = st.st_size
+                os.fsync(fdst.fileno())
+            shutil.copystat(src, part)
+            os.replace(part, dst)
+        except BaseException:
+            # 保留暂存文件和断点信息，下次续传
+            if track:
+                with self._lock:
+                    self._progress.pop(str(src), None)
+            raise
+        try:
+            resume_file.unlink()
+        except OSError:
+            pass
+        progress.finished = time.monotonic()
+        if track:
+            self.__trim()
+
+    @staticmethod
+    def __resume_offset(part: Path, resume_file: Path, signature: dict) -> int:
+        """
+        可续传的位置，源文件已变化时从头复制
+        """
+        try:
+            if json.loads(resume_file.read_text()) != signature:
+                return 0
+            return min(part.stat().st_size, signature["size"])
+        except (OSError, ValueError):
+            return 0
+
+    def __copy_range(self, fsrc: int, fdst: int, offset: int, size: int, progress: CopyProgress,
+                     throttle: Optional[Callable[[int], None]] = None):
+        """
+        从offset开始分块复制，依次尝试 copy_file_range、sendfile、普通读写
+        """
+        method = "copy_file_range" if hasattr(os, "copy_file_range") else "sendfile"
+        while offset < size:
+            if self._stopped and self._stopped.is_set():
+                raise InterruptedError(f"复制中断，已复制 {offset}/{size} 字节")
+            count = min(self._chunk_size, size - offset)
+            try:
+                if method == "copy_file_range":
+                    copied = os.copy_file_range(fsrc, fdst, count, offset, offset)
+                elif method == "sendfile":
+                    os.lseek(fdst, offset, os.SEEK_SET)
+                    copied = os.sendfile(fdst, fsrc, offset, count)
+                else:
+                    os.lseek(fdst, offset, os.SEEK_SET)
+                    copied = os.write(fdst, os.pread(fsrc, min(count, self.READ_SIZE), offset))
+            except OSError as e:
+                # 跨文件系统或不支持时依次降级
+                if method != "readwrite" and e.errno in (errno.EXDEV, errno.EINVAL, errno.ENOSYS,
+                                                         errno.EOPNOTSUPP):
+                    method = "sendfile" if method == "copy_file_range" else "readwrite"
+                    continue
+                raise
+            if copied == 0:
+                # 源文件被截断
+                raise OSError(errno.EIO, f"源文件在 {offset} 字节处意外结束")
+            offset += copied
+            progress.copied = offset
+            if throttle:
+                throttle(copied)
+
+    def __trim(self):
+        """
+        只保留最近完成的若干条进度
+        """
+        with self._lock:
+            finished = sorted((p.finished, key) for key, p in self._progress.items() if p.finished is not None)
+            for _, key in finished[:max(len(finished) - self.KEEP_FINISHED, 0)]:
+                del self._progress[key]
+
+    def progress(self) -> List[Dict[str, Any]]:
+        """
+        正在复制及最近完成的文件进度
+        """
+        with self._lock:
+            items = list(self._progress.values())
+        return [item.to_dict() for item in sorted(items, key=lambda p: p.started, reverse=True)]
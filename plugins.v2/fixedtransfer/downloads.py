@@ -0,0 +1,73 @@
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from app.log import logger
+
+from .cache import TTLCache
+
+
+class DownloadLookup:
+    """
+    下载历史查询
+    防抖队列释放一批文件时批量查询所有文件的下载记录（文件路径 -> 种子Hash -> 下载历史），
+    结果随这一批任务传递，不受缓存容量限制；批量查询失败或未预取的文件退回到逐个查询，
+    逐个查询的结果缓存，同一种子的文件共用一条下载历史
+    """
+
+    def __init__(self, loader: Callable[[Iterable[str]], Tuple[Dict[str, str], Dict[str, Any]]],
+                 file_fallback: Callable[[str], Optional[str]],
+                 history_fallback: Callable[[str], Any],
+                 maxsize: int = 1024, ttl: Optional[float] = 600):
+        """
+        :param loader: 批量查询，返回 (文件路径 -> 种子Hash, 种子Hash -> 下载历史)
+        :param file_fallback: 单个文件路径查询种子Hash
+        :param history_fallback: 单个种子Hash查询下载历史
+        :param maxsize: 每类缓存的最大条数
+        :param ttl: 有效期（秒）
+        """
+        self._loader = loader
+        self._file_fallback = file_fallback
+        self._history_fallback = history_fallback
+        # 文件路径 -> 种子Hash，没有下载记录时为None
+        self._files = TTLCache(maxsize=maxsize, ttl=ttl)
+        # 种子Hash -> 下载历史
+        self._histories = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def prefetch(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """
+        批量查询一批文件的下载记录
+        :return: 文件路径 -> 下载历史（没有下载记录时为None），查询失败时为空
+        """
+        paths = list(paths)
+        if not paths:
+            return {}
+        try:
+            hashes, histories = self._loader(paths)
+        except Exception as e:
+            logger.warn(f"批量查询下载历史失败：{e}，将逐个查询")
+            return {}
+        return {path: histories.get(hashes[path]) if path in hashes else None for path in paths}
+
+    def get(self, path: str, prefetched: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        文件对应的下载历史，没有时返回None
+        :param prefetched: 所属批次预取的结果
+        """
+        if prefetched and path in prefetched:
+            return prefetched[path]
+        download_hash = self._files.get_or_load(path, lambda: self._file_fallback(path))
+        if not download_hash:
+            return None
+        return self._histories.get_or_load(download_hash, lambda: self._history_fallback(download_hash))
+
+    def invalidate(self, path: str):
+        """
+        删除一个文件的缓存
+        """
+        self._files.invalidate(path)
+
+    def clear(self):
+        self._files.clear()
+        self._histories.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"files": self._files.stats(), "histories": self._histories.stats()}
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+from app.log import logger
+
+
+class DebounceQueue:
+    """
+    防抖合并队列
+    同一路径在防抖窗口内的重复事件（创建后移动、连续修改等）只保留最后一次，
+    窗口结束后按批次交给消费者处理，入队方只做字典操作，不做任何耗时工作
+    """
+
+    def __init__(self, consumer: Callable[[List[Tuple[str, Any]]], None],
+                 debounce: float = 3, maxsize: int = 10000, name: str = "debounce"):
+        """
+        :param consumer: 消费者，参数为 [(路径, 载荷)] 批次
+        :param debounce: 防抖窗口（秒）
+        :param maxsize: 队列容量，超出时入队方阻塞等待
+        :param name: 线程名称
+        """
+        self._consumer = consumer
+        self._debounce = max(float(debounce), 0)
+        self._maxsize = max(int(maxsize), 1)
+        self._name = name
+        # 路径 -> [到期时间, 载荷]，重复入队会移到末尾，因此头部总是最早到期的
+        self._pending: "OrderedDict[str, list]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        # 被合并的重复事件数
+        self.coalesced = 0
+
+    def start(self):
+        """
+        启动分发线程
+        """
+        with self._cond:
+            self._stopped = False
+        self._thread = threading.Thread(target=self.__run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        停止分发线程，未到期的事件将被丢弃
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def put(self, key: str, payload: Any = None, block: bool = True, timeout: float = None) -> bool:
+        """
+        入队，同一路径已在队列中时仅刷新到期时间和载荷
+        :return: 是否入队成功，队列已停止或等待超时返回False
+        """
+        with self._cond:
+            if self._stopped:
+                return False
+            entry = self._pending.get(key)
+            if entry is None:
+                end_time = time.monotonic() + timeout if timeout is not None else None
+                while len(self._pending) >= self._maxsize and not self._stopped:
+                    if not block:
+                        return False
+                    remaining = end_time - time.monotonic() if end_time is not None else None
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                if self._stopped:
+                    return False
+                # 等待期间可能已被其它线程放入
+                entry = self._pending.get(key)
+            if entry is not None:
+                self.coalesced += 1
+                entry[0] = time.monotonic() + self._debounce
+                entry[1] = payload
+                self._pending.move_to_end(key)
+            else:
+                self._pending[key] = [time.monotonic() + self._debounce, payload]
+            self._cond.notify_all()
+            return True
+
+    def qsize(self) -> int:
+        """
+        队列中等待的路径数
+        """
+        with self._cond:
+            return len(self._pending)
+
+    def __run(self):
+        """
+        等待最早的事件到期，取出所有已到期的事件交给消费者
+        """
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if not self._pending:
+                        self._cond.wait()
+                        continue
+                    wait = next(iter(self._pending.values()))[0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+                now = time.monotonic()
+                batch = []
+                while self._pending:
+                    key, entry = next(iter(self._pending.items()))
+                    if entry[0] > now:
+                        break
+                    self._pending.popitem(last=False)
+                    batch.append((key, entry[1]))
+                # 释放了容量，唤醒阻塞的入队方
+                self._cond.notify_all()
+            try:
+                self._consumer(batch)
+            except Exception as e:
+                logger.error(f"{self._name} 处理事件批次出错：{e}")
@@ -0,0 +1,142 @@
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.log import logger
+
+# Linux FICLONE ioctl，整文件共享数据块（reflink）
+FICLONE = 0x40049409
+# 探测文件名前缀，以点开头的隐藏文件不会触发目录监控
+PROBE_PREFIX = ".fixedtransfer-probe-"
+
+
+class ProbeResult:
+    """
+    一对源目录、目标目录的探测结果
+    """
+    __slots__ = ("same_device", "hardlink", "reflink", "error")
+
+    def __init__(self, same_device: bool = False, hardlink: bool = False, reflink: bool = False,
+                 error: Optional[str] = None):
+        self.same_device = same_device
+        self.hardlink = hardlink
+        self.reflink = reflink
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "same_device": self.same_device,
+            "hardlink": self.hardlink,
+            "reflink": self.reflink,
+            "error": self.error
+        }
+
+
+def reflink(src_fd: int, dst_fd: int) -> bool:
+    """
+    以 reflink 方式克隆整个文件，不支持时返回False
+    """
+    try:
+        import fcntl
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+class TransferProbe:
+    """
+    转移方式探测
+    启动时对每对源目录、目标目录探测一次：比较设备号，实际测试硬链接和 reflink 是否可用，
+    结果缓存，整理时按目录对选择可用的最快方式：硬链接 > 复制（reflink 由复制引擎使用）
+    """
+
+    # 可自动选择的转移方式，移动、软链接、Rclone 的语义不同，保持配置不变
+    AUTO_TYPES = ("copy", "link")
+
+    def __init__(self):
+        self._results: Dict[Tuple[str, str], ProbeResult] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def __existing(path: Path) -> Optional[Path]:
+        """
+        路径本身或最近一级存在的上级目录
+        """
+        for candidate in (path, *path.parents):
+            if candidate.exists():
+                return candidate
+        return None
+
+    def probe(self, source: str, target: str) -> ProbeResult:
+        """
+        探测一对目录，结果缓存
+        """
+        key = (source, target)
+        with self._lock:
+            result = self._results.get(key)
+        if result is not None:
+            return result
+        result = self.__probe(Path(source), Path(target))
+        with self._lock:
+            self._results[key] = result
+        logger.info(f"{source} -> {target} 转移方式探测：同一设备 {result.same_device}，"
+                    f"硬链接 {result.hardlink}，reflink {result.reflink}"
+                    + (f"，{result.error}" if result.error else ""))
+        return result
+
+    def __probe(self, source: Path, target: Path) -> ProbeResult:
+        target_dir = self.__existing(target)
+        if not source.is_dir() or not target_dir:
+            return ProbeResult(error="目录不存在")
+        try:
+            same_device = source.stat().st_dev == target_dir.stat().st_dev
+        except OSError as e:
+            return ProbeResult(error=str(e))
+        name = f"{PROBE_PREFIX}{uuid.uuid4().hex}"
+        src_file = source / name
+        link_file = target_dir / f"{name}.link"
+        clone_file = target_dir / f"{name}.clone"
+        result = ProbeResult(same_device=same_device)
+        try:
+            with open(src_file, "wb") as f:
+                f.write(b"\0" * 4096)
+            if same_device:
+                try:
+                    os.link(src_file, link_file)
+                    result.hardlink = True
+                except OSError as e:
+                    logger.debug(f"{source} -> {target_dir} 硬链接不可用：{e}")
+            with open(src_file, "rb") as fsrc, open(clone_file, "wb") as fdst:
+                result.reflink = reflink(fsrc.fileno(), fdst.fileno())
+        except OSError as e:
+            result.error = str(e)
+        finally:
+            for file in (src_file, link_file, clone_file):
+                try:
+                    file.unlink()
+                except OSError:
+                    pass
+        return result
+
+    def choose(self, source: str, target: str, configured: str) -> str:
+        """
+        选择转移方式，只在复制和硬链接之间自动切换，其余方式及探测失败时使用配置的方式
+        """
+        if configured not in self.AUTO_TYPES:
+            return configured
+        with self._lock:
+            result = self._results.get((source, target))
+        if result is None or result.error:
+            return configured
+        return "link" if result.hardlink else "copy"
+
+    def get(self, source: str, target: str) -> Optional[ProbeResult]:
+        with self._lock:
+            return self._results.get((source, target))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {f"{source}#{target}": result.to_dict() for (source, target), result in self._results.items()}
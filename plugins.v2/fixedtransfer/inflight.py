@@ -0,0 +1,53 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+
+class InFlightRegistry:
+    """
+    正在处理的文件登记
+    同一路径或同一文件（设备号+inode，如硬链接）同时只允许一个任务处理，
+    监控事件、全量同步、重试同时提交的重复任务直接合并，不再重复转移和写入历史记录
+    """
+
+    def __init__(self):
+        # 路径 -> (设备号, inode)
+        self._paths: Dict[str, Optional[Tuple[int, int]]] = {}
+        # (设备号, inode) -> 路径
+        self._inodes: Dict[Tuple[int, int], str] = {}
+        self._lock = threading.Lock()
+        # 被合并的重复任务数
+        self.collapsed = 0
+
+    def acquire(self, path: str) -> Optional[str]:
+        """
+        登记开始处理
+        :return: 登记成功返回None，同一文件已在处理中时返回正在处理的路径
+        """
+        try:
+            st = os.stat(path)
+            inode = (st.st_dev, st.st_ino)
+        except OSError:
+            inode = None
+        with self._lock:
+            owner = path if path in self._paths else self._inodes.get(inode) if inode else None
+            if owner is not None:
+                self.collapsed += 1
+                return owner
+            self._paths[path] = inode
+            if inode:
+                self._inodes[inode] = path
+        return None
+
+    def release(self, path: str):
+        """
+        处理结束
+        """
+        with self._lock:
+            inode = self._paths.pop(path, None)
+            if inode and self._inodes.get(inode) == path:
+                del self._inodes[inode]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._paths)
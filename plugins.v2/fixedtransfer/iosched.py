@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class TokenBucket:
+    """
+    令牌桶限速
+    允许透支，透支后调用方按欠下的字节数等待，多个调用方的等待时间依次累加
+    """
+
+    def __init__(self, rate: float):
+        """
+        :param rate: 每秒字节数
+        """
+        self._rate = float(rate)
+        # 最多积攒1秒的令牌
+        self._available = self._rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        # 累计限速等待秒数
+        self.waited = 0.0
+
+    def consume(self, amount: int, stopped: Optional[threading.Event] = None):
+        """
+        消耗令牌，不足时等待
+        :param amount: 字节数
+        :param stopped: 退出事件，设置后立即返回
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._available = min(self._available + (now - self._last) * self._rate, self._rate)
+            self._last = now
+            self._available -= amount
+            wait = -self._available / self._rate if self._available < 0 else 0
+            self.waited += wait
+        if wait > 0:
+            if stopped:
+                stopped.wait(wait)
+            else:
+                time.sleep(wait)
+
+
+class IoLease:
+    """
+    一次复制占用的槽位
+    复制引擎每复制一块调用 throttle 限速；chain.transfer、Rclone 等无法分块的复制不限速，
+    复制完成后再等待并不能降低复制时的带宽，只会让整理线程空等
+    """
+    __slots__ = ("_bucket", "_stopped")
+
+    def __init__(self, bucket: Optional[TokenBucket], stopped: Optional[threading.Event]):
+        self._bucket = bucket
+        self._stopped = stopped
+
+    def throttle(self, amount: int):
+        """
+        消耗amount字节的令牌，不足时等待
+        """
+        if self._bucket and amount:
+            self._bucket.consume(amount, stopped=self._stopped)
+
+
+class _Device:
+    """
+    一个设备的并发槽位与统计
+    """
+    __slots__ = ("semaphore", "active", "waiting", "bytes")
+
+    def __init__(self, limit: int):
+        self.semaphore = threading.BoundedSemaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.bytes = 0
+
+
+class DeviceScheduler:
+    """
+    按设备调度复制类转移
+    同一块磁盘上同时进行的复制数受限，避免多个大文件交替读写导致磁头来回寻道，
+    不同磁盘之间互不影响；可选总带宽上限，只对复制引擎按块复制生效
+    """
+
+    def __init__(self, per_device: int = 1, bandwidth: float = 0, stopped: Optional[threading.Event] = None):
+        """
+        :param per_device: 每个设备同时进行的复制数
+        :param bandwidth: 总带宽上限（字节/秒），为0时不限速
+        :param stopped: 退出事件
+        """
+        self._per_device = max(int(per_device), 1)
+        self._bucket = TokenBucket(bandwidth) if bandwidth > 0 else None
+        self._stopped = stopped
+        self._devices: Dict[int, _Device] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def device_of(path: str) -> Optional[int]:
+        """
+        路径所在设备，路径不存在时取最近一级存在的上级目录
+        """
+        for candidate in (Path(path), *Path(path).parents):
+            try:
+                return os.stat(candidate).st_dev
+            except OSError:
+                continue
+        return None
+
+    def __device(self, dev: int) -> _Device:
+        with self._lock:
+            device = self._devices.get(dev)
+            if device is None:
+                device = self._devices[dev] = _Device(self._per_device)
+            return device
+
+    @contextmanager
+    def slot(self, paths: Iterable[str], size: int = 0):
+        """
+        占用源文件和目标目录所在设备的槽位
+        多个设备按设备号顺序获取，避免互相等待死锁
+        :param paths: 源文件、目标目录
+        :param size: 文件大小（字节）
+        """
+        devs: List[int] = sorted({dev for dev in (self.device_of(path) for path in paths) if dev is not None})
+        devices = [self.__device(dev) for dev in devs]
+        lease = IoLease(self._bucket, self._stopped)
+        acquired = []
+        try:
+            for device in devices:
+                with self._lock:
+                    device.waiting += 1
+                device.semaphore.acquire()
+                acquired.append(device)
+                with self._lock:
+                    device.waiting -= 1
+                    device.active += 1
+            yield lease
+            with self._lock:
+                for device in devices:
+                    device.bytes += size
+        finally:
+            for device in reversed(acquired):
+                with self._lock:
+                    device.active -= 1
+                device.semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "per_device": self._per_device,
+                "paced_seconds": round(self._bucket.waited, 1) if self._bucket else 0,
+                "devices": {
+                    str(dev): {"active": device.active, "waiting": device.waiting, "bytes": device.bytes}
+                    for dev, device in self._devices.items()
+                }
+            }
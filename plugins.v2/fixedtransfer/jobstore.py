@@ -0,0 +1,154 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from app.log import logger
+
+
+class JobStore:
+    """
+    持久化任务队列
+    收到的文件事件先写入SQLite，处理过程中记录状态，处理完成后删除，
+    插件重启或重新配置后只需恢复未完成的任务，不需要全量扫描目录
+    """
+
+    # 等待防抖和稳定检测
+    PENDING = "pending"
+    # 已稳定，等待整理
+    STABLE = "stable"
+    # 识别中
+    RECOGNISING = "recognising"
+    # 转移中
+    TRANSFERRING = "transferring"
+    # 失败，等待重试（重启后重新安排重试）
+    RETRYING = "retrying"
+    # 已完成（完成的任务直接删除，不落库）
+    DONE = "done"
+    # 失败
+    FAILED = "failed"
+
+    # 失败任务保留时间（秒）
+    FAILED_KEEP_SECONDS = 7 * 24 * 3600
+
+    def __init__(self, file: Path):
+        """
+        :param file: 数据库文件
+        """
+        self.file = file
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        """
+        打开数据库并清理过期的失败任务
+        """
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.file), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS jobs ("
+                     "path TEXT PRIMARY KEY, mon_path TEXT NOT NULL, text TEXT, "
+                     "state TEXT NOT NULL, updated REAL NOT NULL, "
+                     "is_directory INTEGER NOT NULL DEFAULT 0, attempt INTEGER NOT NULL DEFAULT 0)")
+        # 旧版本的表补充新增的列
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column in ("is_directory", "attempt"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        conn.execute("DELETE FROM jobs WHERE state = ? AND updated < ?",
+                     (self.FAILED, time.time() - self.FAILED_KEEP_SECONDS))
+        with self._lock:
+            self._conn = conn
+
+    def close(self):
+        """
+        关闭数据库
+        """
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def __execute(self, sql: str, params: tuple = ()):
+        with self._lock:
+            if not self._conn:
+                return
+            try:
+                self._conn.execute(sql, params)
+            except sqlite3.Error as e:
+                logger.error(f"任务队列写入失败：{e}")
+
+    def __executemany(self, sql: str, params: Iterable[tuple]):
+        with self._lock:
+            if not self._conn:
+                return
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(sql, params)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                logger.error(f"任务队列写入失败：{e}")
+                try:
+                    self._conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+
+    def put(self, path: str, mon_path: str, text: str, is_directory: bool = False):
+        """
+        新增或重置为等待中的任务
+        """
+        self.__execute("INSERT OR REPLACE INTO jobs (path, mon_path, text, state, updated, is_directory, attempt) "
+                       "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                       (path, mon_path, text, self.PENDING, time.time(), int(is_directory)))
+
+    def set_retry(self, path: str, attempt: int):
+        """
+        标记为等待重试，记录已执行的次数，重启后从该次数继续重试
+        """
+        self.__execute("UPDATE jobs SET state = ?, attempt = ?, updated = ? WHERE path = ?",
+                       (self.RETRYING, attempt, time.time(), path))
+
+    def set_state(self, path: str, state: str):
+        """
+        更新任务状态，完成的任务直接删除
+        """
+        if state == self.DONE:
+            self.__execute("DELETE FROM jobs WHERE path = ?", (path,))
+        else:
+            self.__execute("UPDATE jobs SET state = ?, updated = ? WHERE path = ?", (state, time.time(), path))
+
+    def set_states(self, paths: Iterable[str], state: str):
+        """
+        批量更新任务状态
+        """
+        now = time.time()
+        if state == self.DONE:
+            self.__executemany("DELETE FROM jobs WHERE path = ?", ((path,) for path in paths))
+        else:
+            self.__executemany("UPDATE jobs SET state = ?, updated = ? WHERE path = ?",
+                               ((state, now, path) for path in paths))
+
+    def unfinished(self) -> List[Tuple[str, str, str, str, bool, int]]:
+        """
+        所有未完成的任务
+        :return: [(文件路径, 监控目录, 事件描述, 状态, 是否目录, 已执行的次数)]
+        """
+        with self._lock:
+            if not self._conn:
+                return []
+            rows = self._conn.execute("SELECT path, mon_path, text, state, is_directory, attempt FROM jobs "
+                                      "WHERE state NOT IN (?, ?) ORDER BY updated",
+                                      (self.DONE, self.FAILED)).fetchall()
+        return [(path, mon_path, text, state, bool(is_directory), attempt)
+                for path, mon_path, text, state, is_directory, attempt in rows]
+
+    def counts(self) -> dict:
+        """
+        各状态的任务数
+        """
+        with self._lock:
+            if not self._conn:
+                return {}
+            return dict(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
@@ -0,0 +1,104 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List
+
+
+class _Stage:
+    """
+    一个阶段的耗时统计：总次数、总耗时、最大值，以及最近若干次耗时的滚动窗口
+    """
+    __slots__ = ("count", "total", "max", "window")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.window: Deque[float] = deque(maxlen=window)
+
+
+class Metrics:
+    """
+    整理各阶段耗时与计数统计
+    每个阶段保留最近若干次耗时用于计算分位数，只在查询时排序，记录时只做追加
+    """
+
+    # 分位数
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window: int = 1024):
+        """
+        :param window: 每个阶段保留的最近耗时数量
+        """
+        self._window = max(int(window), 1)
+        self._stages: Dict[str, _Stage] = {}
+        self._counters: Dict[str, int] = {}
+        self._started = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        """
+        记录一次阶段耗时
+        """
+        with self._lock:
+            item = self._stages.get(stage)
+            if item is None:
+                item = self._stages[stage] = _Stage(self._window)
+            item.count += 1
+            item.total += seconds
+            if seconds > item.max:
+                item.max = seconds
+            item.window.append(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """
+        计时上下文，异常时同样记录耗时
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def incr(self, counter: str, value: int = 1):
+        """
+        计数器累加
+        """
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    @staticmethod
+    def __percentile(values: List[float], percent: int) -> float:
+        """
+        已排序数据的分位数（最近秩）
+        """
+        index = max(math.ceil(percent / 100 * len(values)) - 1, 0)
+        return values[min(index, len(values) - 1)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        当前统计，耗时单位为毫秒
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            stages = {name: (item.count, item.total, item.max, list(item.window))
+                      for name, item in self._stages.items()}
+        result = {}
+        for name, (count, total, max_value, window) in stages.items():
+            window.sort()
+            stat = {
+                "count": count,
+                "avg": round(total / count * 1000, 2) if count else 0,
+                "max": round(max_value * 1000, 2)
+            }
+            for percent in self.PERCENTILES:
+                stat[f"p{percent}"] = round(self.__percentile(window, percent) * 1000, 2) if window else 0
+            result[name] = stat
+        return {
+            "uptime": round(time.time() - self._started),
+            "counters": counters,
+            "stages": result
+        }
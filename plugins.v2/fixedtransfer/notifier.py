@@ -0,0 +1,161 @@
+import heapq
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.log import logger
+
+
+class FileRecord:
+    """
+    已入库文件的精简记录，只保留汇总消息需要的大小和集数
+    """
+    __slots__ = ("size", "episode")
+
+    def __init__(self, size: int = 0, episode: Optional[int] = None):
+        self.size = size
+        self.episode = episode
+
+
+class MessageGroup:
+    """
+    一组待汇总发送的入库消息（同一媒体同一季）
+    组内所有文件共用一份媒体信息，每个文件只保存精简记录
+    """
+    __slots__ = ("key", "context", "files", "deadline")
+
+    def __init__(self, key: str, context: Any = None):
+        self.key = key
+        # 组内共用的媒体信息
+        self.context = context
+        # 文件路径 -> 文件记录
+        self.files: Dict[str, FileRecord] = {}
+        # 发送时间（单调时钟）
+        self.deadline = 0.0
+
+
+class MessageAggregator:
+    """
+    入库消息汇总
+    按组缓存已入库的文件，组内以路径索引去重；用最小堆维护各组的发送时间，
+    线程只在最近一组到期时唤醒，组内每新增一个文件发送时间顺延
+    """
+
+    def __init__(self, send: Callable[[MessageGroup], None], interval: float = 10, name: str = "message"):
+        """
+        :param send: 发送一组消息
+        :param interval: 组内最后一个文件入库后等待的秒数
+        :param name: 线程名称
+        """
+        self._send = send
+        self._interval = max(float(interval), 0)
+        self._name = name
+        self._groups: Dict[str, MessageGroup] = {}
+        # (发送时间, 序号, 组键)，组的发送时间顺延后旧条目在出堆时丢弃
+        self._heap: List[tuple] = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        启动发送线程
+        """
+        with self._cond:
+            self._stopped = False
+        self._thread = threading.Thread(target=self.__run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> List[MessageGroup]:
+        """
+        停止发送线程
+        :return: 未发送的组，可交给新的实例继续等待发送
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        with self._cond:
+            groups = list(self._groups.values())
+            self._groups.clear()
+            self._heap.clear()
+        return groups
+
+    def adopt(self, groups: List[MessageGroup]):
+        """
+        接管其它实例未发送的组，保留原来的发送时间，已有同名组时合并文件
+        """
+        with self._cond:
+            for group in groups:
+                current = self._groups.get(group.key)
+                if current is None:
+                    current = self._groups[group.key] = group
+                else:
+                    for path, record in group.files.items():
+                        current.files.setdefault(path, record)
+                    current.deadline = max(current.deadline, group.deadline)
+                self._seq += 1
+                heapq.heappush(self._heap, (current.deadline, self._seq, current.key))
+            self._cond.notify_all()
+
+    def add(self, key: str, path: str, record: FileRecord, context: Any = None, immediately: bool = False):
+        """
+        添加一个已入库的文件，同一路径重复添加时忽略
+        :param key: 组键
+        :param path: 文件路径
+        :param record: 文件记录
+        :param context: 组内共用的媒体信息，只在新建组时保存
+        :param immediately: 是否立即发送（电影）
+        """
+        with self._cond:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = MessageGroup(key, context)
+            if path not in group.files:
+                group.files[path] = record
+            group.deadline = time.monotonic() + (0 if immediately else self._interval)
+            self._seq += 1
+            heapq.heappush(self._heap, (group.deadline, self._seq, key))
+            self._cond.notify_all()
+
+    def pending(self) -> int:
+        """
+        等待发送的组数
+        """
+        with self._cond:
+            return len(self._groups)
+
+    def __run(self):
+        """
+        等待最近一组到期并发送
+        """
+        while True:
+            with self._cond:
+                group = None
+                while not self._stopped:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline, _, key = self._heap[0]
+                    wait = deadline - time.monotonic()
+                    if wait > 0:
+                        self._cond.wait(wait)
+                        continue
+                    heapq.heappop(self._heap)
+                    group = self._groups.get(key)
+                    # 组已发送，或发送时间已顺延
+                    if group is None or group.deadline > deadline:
+                        group = None
+                        continue
+                    del self._groups[key]
+                    break
+                if self._stopped:
+                    return
+            logger.info(f"开始处理媒体 {group.key} 消息")
+            try:
+                self._send(group)
+            except Exception as e:
+                logger.error(f"发送 {group.key} 入库消息出错：{e}")
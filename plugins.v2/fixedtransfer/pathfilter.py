@@ -0,0 +1,91 @@
+import os
+import re
+from typing import Dict, Iterable, Optional, Pattern
+
+from app.log import logger
+
+# 前缀树中的结束标记
+_END = ""
+
+
+class PathFilter:
+    """
+    编译后的路径过滤规则
+    配置变化时构建一次：媒体后缀为集合，忽略目录为目录名前缀树，排除关键字合并为一个正则，
+    每个事件只需一次集合查找、一次路径分段匹配和一次正则搜索
+    """
+
+    # 忽略的目录名前缀：回收站、群晖索引目录、隐藏目录
+    IGNORED_PREFIXES = ("@Recycle", "#recycle", "@eaDir", ".")
+
+    def __init__(self, extensions: Iterable[str], exclude_keywords: str = ""):
+        """
+        :param extensions: 媒体文件后缀，如 .mkv
+        :param exclude_keywords: 排除关键字，每行一个正则表达式
+        """
+        self.extensions = frozenset(ext.lower() for ext in extensions)
+        self._trie: Dict[str, dict] = {}
+        for prefix in self.IGNORED_PREFIXES:
+            node = self._trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[_END] = {}
+        self._exclude = self.__compile(exclude_keywords)
+
+    @staticmethod
+    def __compile(exclude_keywords: str) -> Optional[Pattern]:
+        """
+        合并排除关键字，无效的正则表达式忽略
+        """
+        keywords = []
+        for keyword in (exclude_keywords or "").split("\n"):
+            keyword = keyword.strip()
+            if not keyword:
+                continue
+            try:
+                re.compile(keyword)
+            except re.error as e:
+                logger.warn(f"排除关键字 {keyword} 不是有效的正则表达式：{e}")
+                continue
+            keywords.append(f"(?:{keyword})")
+        return re.compile("|".join(keywords)) if keywords else None
+
+    def ignored_name(self, name: str) -> bool:
+        """
+        目录或文件名是否以忽略的前缀开头
+        """
+        node = self._trie
+        for char in name:
+            node = node.get(char)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+    def ignored(self, path: str) -> bool:
+        """
+        路径中是否有回收站或隐藏的目录、文件
+        """
+        return any(self.ignored_name(part) for part in path.split(os.sep)[1:] if part)
+
+    def is_media(self, path: str) -> bool:
+        """
+        是否媒体文件
+        """
+        return os.path.splitext(path)[1].lower() in self.extensions
+
+    def excluded(self, path: str) -> Optional[str]:
+        """
+        命中的排除关键字内容，未命中时返回None
+        """
+        if not self._exclude:
+            return None
+        match = self._exclude.search(path)
+        return match.group(0) if match else None
+
+    def accept(self, path: str) -> bool:
+        """
+        是否需要处理，监控线程中调用，不需要处理的事件不再进入队列
+        """
+        return self.is_media(path) and not self.ignored(path) and self.excluded(path) is None
@@ -0,0 +1,251 @@
+import heapq
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from app.log import logger
+
+
+class _DirState:
+    """
+    目录快照条目：目录修改时间、子目录名、媒体文件名
+    """
+    __slots__ = ("mtime", "dirs", "files")
+
+    def __init__(self, mtime: int, dirs: Set[str], files: Set[str]):
+        self.mtime = mtime
+        self.dirs = dirs
+        self.files = files
+
+
+class _Root:
+    """
+    一个轮询的监控目录
+    """
+
+    def __init__(self, path: str, callback: Callable[[str, str], None], exclude: Set[str]):
+        self.path = path
+        self.callback = callback
+        # 不轮询的子目录（已由其它监控方式负责）
+        self.exclude = exclude
+        # 目录路径 -> 快照条目
+        self.dirs: Dict[str, _DirState] = {}
+        self.interval = 0.0
+        self.ready = False
+
+
+class PollingMonitor:
+    """
+    快照比对轮询监控
+    只保存目录的修改时间和媒体文件名，每轮只stat目录，修改时间变化的目录才重新列出，
+    新出现的媒体文件回调通知；每个监控目录的轮询间隔按最近是否有变化自适应调整，
+    有变化时缩短到最小间隔，空闲时逐步加倍到最大间隔
+    """
+
+    def __init__(self, extensions: Iterable[str], min_interval: float = 5, max_interval: float = 300,
+                 name: str = "polling", skip_dir: Optional[Callable[[str], bool]] = None):
+        """
+        :param extensions: 媒体文件后缀
+        :param min_interval: 最小轮询间隔（秒）
+        :param max_interval: 最大轮询间隔（秒）
+        :param name: 线程名称
+        :param skip_dir: 按目录名判断是否跳过整个子目录
+        """
+        self._exts = {ext.lower() for ext in extensions}
+        self._skip_dir = skip_dir
+        self._min_interval = max(float(min_interval), 0.1)
+        self._max_interval = max(float(max_interval), self._min_interval)
+        self._name = name
+        self._roots: List[_Root] = []
+        # (下次轮询时间, 序号, 监控目录)
+        self._heap: list = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, path: str, callback: Callable[[str, str], None], exclude: Iterable[str] = ()):
+        """
+        添加监控目录
+        :param path: 监控目录
+        :param callback: 发现新文件时的回调，参数为 (文件路径, 监控目录)
+        :param exclude: 不轮询的子目录
+        """
+        root = _Root(path=path, callback=callback, exclude={os.path.normpath(p) for p in exclude})
+        root.interval = self._min_interval
+        with self._cond:
+            self._roots.append(root)
+            self.__push(root, time.monotonic())
+            self._cond.notify_all()
+
+    def start(self):
+        """
+        启动轮询线程
+        """
+        with self._cond:
+            self._stopped = False
+        self._thread = threading.Thread(target=self.__run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        停止轮询
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def join(self, timeout: float = None):
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def stats(self) -> List[dict]:
+        """
+        各监控目录的轮询状态
+        """
+        with self._cond:
+            return [{
+                "path": root.path,
+                "dirs": len(root.dirs),
+                "interval": root.interval,
+                "ready": root.ready
+            } for root in self._roots]
+
+    def __str__(self):
+        return f"PollingMonitor({', '.join(root.path for root in self._roots)})"
+
+    def __push(self, root: _Root, due: float):
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, root))
+
+    def __run(self):
+        """
+        按到期时间依次轮询各监控目录
+        """
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+                _, _, root = heapq.heappop(self._heap)
+            try:
+                if not root.ready:
+                    # 首次只建立快照，不通知已存在的文件
+                    self.__scan_tree(root, root.path, notify=False)
+                    root.ready = True
+                    logger.info(f"{root.path} 轮询快照已建立，共 {len(root.dirs)} 个目录")
+                    changed = False
+                else:
+                    changed = self.__poll(root)
+            except Exception as e:
+                logger.error(f"{root.path} 轮询出错：{e}")
+                changed = False
+            # 有变化时缩短间隔，空闲时逐步延长
+            if changed:
+                root.interval = self._min_interval
+            else:
+                root.interval = min(root.interval * 2, self._max_interval)
+            with self._cond:
+                if not self._stopped:
+                    self.__push(root, time.monotonic() + root.interval)
+
+    def __poll(self, root: _Root) -> bool:
+        """
+        轮询一次，只重新列出修改时间变化的目录
+        :return: 是否有变化
+        """
+        changed = False
+        for path in list(root.dirs.keys()):
+            if self._stopped:
+                break
+            state = root.dirs.get(path)
+            if state is None:
+                # 已随上级目录一起移除
+                continue
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                self.__drop_tree(root, path)
+                changed = True
+                continue
+            if mtime == state.mtime:
+                continue
+            changed = True
+            self.__rescan_dir(root, path, state, mtime)
+        return changed
+
+    def __list_dir(self, root: _Root, path: str):
+        """
+        列出目录下的子目录和媒体文件
+        """
+        dirs, files = set(), set()
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self._skip_dir and self._skip_dir(entry.name):
+                            continue
+                        if os.path.normpath(entry.path) not in root.exclude:
+                            dirs.add(entry.name)
+                    elif os.path.splitext(entry.name)[1].lower() in self._exts:
+                        files.add(entry.name)
+                except OSError:
+                    continue
+        return dirs, files
+
+    def __scan_tree(self, root: _Root, path: str, notify: bool):
+        """
+        扫描整个子目录树并记录快照
+        """
+        stack = [path]
+        while stack and not self._stopped:
+            current = stack.pop()
+            try:
+                mtime = os.stat(current).st_mtime_ns
+                dirs, files = self.__list_dir(root, current)
+            except OSError as e:
+                logger.debug(f"轮询扫描 {current} 出错：{e}")
+                continue
+            root.dirs[current] = _DirState(mtime=mtime, dirs=dirs, files=files)
+            if notify:
+                for name in files:
+                    root.callback(os.path.join(current, name), root.path)
+            stack.extend(os.path.join(current, name) for name in dirs)
+
+    def __rescan_dir(self, root: _Root, path: str, state: _DirState, mtime: int):
+        """
+        重新列出一个目录，通知新增的媒体文件，新增的子目录整体扫描
+        """
+        try:
+            dirs, files = self.__list_dir(root, path)
+        except OSError:
+            self.__drop_tree(root, path)
+            return
+        for name in files - state.files:
+            root.callback(os.path.join(path, name), root.path)
+        for name in state.dirs - dirs:
+            self.__drop_tree(root, os.path.join(path, name))
+        new_dirs = dirs - state.dirs
+        state.mtime, state.dirs, state.files = mtime, dirs, files
+        for name in new_dirs:
+            self.__scan_tree(root, os.path.join(path, name), notify=True)
+
+    @staticmethod
+    def __drop_tree(root: _Root, path: str):
+        """
+        移除目录及其所有子目录的快照
+        """
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            state = root.dirs.pop(current, None)
+            if state is not None:
+                stack.extend(os.path.join(current, name) for name in state.dirs)
@@ -0,0 +1,146 @@
+import heapq
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.log import logger
+
+
+class PermanentError(Exception):
+    """
+    重试也不会成功的失败，如文件名无法解析
+    """
+
+
+class RetryQueue:
+    """
+    失败重试队列
+    按指数退避加随机抖动安排重试，每个路径有最大重试次数，同时进行的重试数有上限
+    """
+
+    def __init__(self, submit: Callable[[str, Any, int, Callable[[], None]], bool],
+                 max_attempts: int = 3, base_delay: float = 60, max_delay: float = 3600,
+                 max_concurrent: int = 2, name: str = "retry"):
+        """
+        :param submit: 执行重试，参数为 (路径, 载荷, 第几次重试, 完成回调)，返回是否提交成功
+        :param max_attempts: 每个路径的最大重试次数，为0时不重试
+        :param base_delay: 第一次重试的延迟（秒），之后每次加倍
+        :param max_delay: 最大延迟（秒）
+        :param max_concurrent: 同时进行的重试数
+        :param name: 线程名称
+        """
+        self._submit = submit
+        self._max_attempts = max(int(max_attempts), 0)
+        self._base_delay = max(float(base_delay), 0)
+        self._max_delay = max(float(max_delay), self._base_delay)
+        self._slots = threading.BoundedSemaphore(max(int(max_concurrent), 1))
+        self._name = name
+        # (到期时间, 序号, 路径)
+        self._heap: list = []
+        self._seq = 0
+        # 路径 -> (载荷, 第几次重试)，堆中同一路径只保留最新的安排
+        self._scheduled: Dict[str, tuple] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_attempts > 0
+
+    def can_retry(self, attempt: int) -> bool:
+        """
+        第attempt次执行失败后是否还会重试（首次执行为0）
+        """
+        return attempt < self._max_attempts
+
+    def start(self):
+        """
+        启动重试线程
+        """
+        with self._cond:
+            self._stopped = False
+        if not self.enabled:
+            return
+        self._thread = threading.Thread(target=self.__run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        停止重试线程，未到期的重试将被丢弃
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def delay(self, attempt: int) -> float:
+        """
+        第attempt次重试的延迟：指数退避，并在 [延迟/2, 延迟] 之间随机抖动，避免大量失败同时重试
+        """
+        delay = min(self._base_delay * (2 ** max(attempt - 1, 0)), self._max_delay)
+        return random.uniform(delay / 2, delay)
+
+    def schedule(self, path: str, payload: Any, attempt: int) -> bool:
+        """
+        安排一次重试
+        :param path: 文件路径
+        :param payload: 载荷
+        :param attempt: 已执行的次数（首次执行为0）
+        :return: 是否已安排，超过最大重试次数返回False
+        """
+        if not self.can_retry(attempt):
+            return False
+        attempt += 1
+        delay = self.delay(attempt)
+        with self._cond:
+            if self._stopped:
+                return False
+            self._seq += 1
+            self._scheduled[path] = (payload, attempt, self._seq)
+            heapq.heappush(self._heap, (time.monotonic() + delay, self._seq, path))
+            self._cond.notify_all()
+        logger.info(f"{path} 将在 {int(delay)} 秒后第 {attempt} 次重试")
+        return True
+
+    def qsize(self) -> int:
+        """
+        等待重试的路径数
+        """
+        with self._cond:
+            return len(self._scheduled)
+
+    def __run(self):
+        """
+        等待重试到期，在并发上限内提交重试
+        """
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+                _, seq, path = heapq.heappop(self._heap)
+                scheduled = self._scheduled.get(path)
+                # 已被更新的安排覆盖
+                if not scheduled or scheduled[2] != seq:
+                    continue
+                del self._scheduled[path]
+            payload, attempt, _ = scheduled
+            self._slots.acquire()
+            try:
+                submitted = self._submit(path, payload, attempt, self._slots.release)
+            except Exception as e:
+                logger.error(f"{path} 提交重试失败：{e}")
+                submitted = False
+            if not submitted:
+                self._slots.release()
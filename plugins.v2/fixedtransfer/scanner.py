@@ -0,0 +1,83 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from app.log import logger
+
+# 目录扫描完成标记
+_DONE = object()
+
+
+def scan_files(root: str, extensions: Iterable[str], workers: int = 4, buffer: int = 1000,
+               skip_dir: Optional[Callable[[str], bool]] = None) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    流式并行扫描目录下的媒体文件
+    每个子目录作为一个任务由线程池并行列出，匹配的文件一经发现立即产出，
+    不需要等待整棵目录树遍历完成，内存占用与目录树大小无关
+    :param root: 根目录
+    :param extensions: 文件后缀，如 .mkv
+    :param workers: 并行扫描的线程数
+    :param buffer: 已发现但未消费的文件数上限，超出时扫描线程等待
+    :param skip_dir: 按目录名判断是否跳过整个子目录
+    :return: (文件路径, stat结果) 迭代器
+    """
+    exts = {ext.lower() for ext in extensions}
+    results = queue.Queue(maxsize=max(int(buffer), 1))
+    # 调用方提前结束迭代时通知扫描线程退出
+    cancelled = threading.Event()
+    # 已提交但未完成的目录任务数
+    pending = 0
+    pending_lock = threading.Lock()
+
+    def __put(item) -> bool:
+        while not cancelled.is_set():
+            try:
+                results.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __scan(path: str):
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if cancelled.is_set():
+                        return
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not skip_dir or not skip_dir(entry.name):
+                                __submit(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in exts:
+                            if not __put((entry.path, entry.stat())):
+                                return
+                    except OSError as e:
+                        logger.debug(f"扫描 {entry.path} 出错：{e}")
+        except OSError as e:
+            logger.warn(f"扫描目录 {path} 出错：{e}")
+        finally:
+            __put(_DONE)
+
+    def __submit(path: str):
+        nonlocal pending
+        with pending_lock:
+            pending += 1
+        executor.submit(__scan, path)
+
+    executor = ThreadPoolExecutor(max_workers=max(int(workers), 1), thread_name_prefix="fixedtransfer-scan")
+    try:
+        __submit(root)
+        while True:
+            item = results.get()
+            if item is _DONE:
+                with pending_lock:
+                    pending -= 1
+                    if pending == 0:
+                        return
+                continue
+            yield item
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
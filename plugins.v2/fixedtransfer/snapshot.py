@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Dict, Tuple
+
+from app.log import logger
+
+# (大小, 修改时间纳秒, inode)
+Signature = Tuple[int, int, int]
+
+
+class DirectorySnapshot:
+    """
+    目录快照
+    记录监控目录下每个媒体文件的大小、修改时间和inode，以相对路径压缩保存到插件数据目录，
+    下次全量同步时与快照比较，只处理新增或变化的文件；
+    整理相关配置变化时快照自动作废
+    """
+
+    # 快照格式版本，格式变化时旧快照作废
+    VERSION = 1
+
+    def __init__(self, root: str, file: Path, fingerprint: str = ""):
+        """
+        :param root: 监控目录
+        :param file: 快照文件
+        :param fingerprint: 配置指纹，与快照中记录的不一致时快照作废
+        """
+        self.root = root
+        self.file = file
+        self.fingerprint = fingerprint
+
+    @staticmethod
+    def signature(st: os.stat_result) -> Signature:
+        """
+        文件签名
+        """
+        return st.st_size, st.st_mtime_ns, st.st_ino
+
+    def load(self) -> Dict[str, Signature]:
+        """
+        读取快照，不存在或损坏时返回空快照
+        """
+        if not self.file.exists():
+            return {}
+        try:
+            with gzip.open(self.file, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warn(f"读取目录快照 {self.file} 失败：{e}")
+            return {}
+        if (data.get("version") != self.VERSION
+                or data.get("root") != self.root
+                or data.get("fingerprint") != self.fingerprint):
+            return {}
+        return {
+            os.path.join(self.root, rel): (size, mtime, ino)
+            for rel, size, mtime, ino in data.get("entries") or []
+        }
+
+    def save(self, entries: Dict[str, Signature]):
+        """
+        保存快照，先写临时文件再替换，避免中断时留下不完整的快照
+        """
+        data = {
+            "version": self.VERSION,
+            "root": self.root,
+            "fingerprint": self.fingerprint,
+            "entries": [
+                [os.path.relpath(path, self.root), size, mtime, ino]
+                for path, (size, mtime, ino) in entries.items()
+            ]
+        }
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.file.with_name(self.file.name + ".tmp")
+        try:
+            with gzip.open(tmp_file, "wt", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_file, self.file)
+        except Exception as e:
+            logger.error(f"保存目录快照 {self.file} 失败：{e}")
+            tmp_file.unlink(missing_ok=True)
+
+    def delete(self):
+        """
+        删除快照
+        """
+        self.file.unlink(missing_ok=True)
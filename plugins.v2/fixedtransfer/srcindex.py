@@ -0,0 +1,80 @@
+import threading
+from typing import Callable, Iterable, Optional, Set
+
+from app.log import logger
+
+
+class TransferredIndex:
+    """
+    已整理源文件索引
+    一次性批量加载所有已整理的源路径到内存，未命中时不再查询数据库；
+    命中时再精确查询一次确认记录仍存在（历史记录可能已在别处删除），批量加载失败时退回到逐个路径查询
+    """
+
+    def __init__(self, loader: Callable[[], Optional[Iterable[str]]], fallback: Callable[[str], bool]):
+        """
+        :param loader: 批量加载所有已整理源路径，失败返回None
+        :param fallback: 单个路径的精确查询
+        """
+        self._loader = loader
+        self._fallback = fallback
+        self._paths: Set[str] = set()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> bool:
+        """
+        批量加载索引，返回是否成功
+        """
+        try:
+            paths = self._loader()
+        except Exception as e:
+            logger.error(f"加载已整理文件索引失败：{e}")
+            paths = None
+        with self._lock:
+            if paths is None:
+                self._paths = set()
+                self._loaded = False
+                return False
+            self._paths = set(paths)
+            self._loaded = True
+        logger.info(f"已加载 {len(self._paths)} 条已整理文件索引")
+        return True
+
+    def contains(self, path: str, confirm: bool = True) -> bool:
+        """
+        是否已整理过
+        :param confirm: 命中时是否查询数据库确认，刚重新加载过索引时不需要
+        """
+        if not self._loaded:
+            return bool(self._fallback(path))
+        with self._lock:
+            if path not in self._paths:
+                return False
+        if not confirm or self._fallback(path):
+            return True
+        # 历史记录已被删除，需要重新整理
+        self.discard(path)
+        return False
+
+    def add(self, path: str):
+        """
+        记录已整理的源路径
+        """
+        with self._lock:
+            self._paths.add(path)
+
+    def discard(self, path: str):
+        """
+        移除源路径
+        """
+        with self._lock:
+            self._paths.discard(path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._paths)
@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.log import logger
+
+
+class StabilityGate:
+    """
+    文件稳定检测
+    文件大小和修改时间在指定秒数内不再变化才放行，避免整理下载中或挂载盘未写完的文件，
+    所有等待中的文件由同一个线程按周期统一检查一次状态，稳定的文件按批次放行
+    """
+
+    def __init__(self, consumer: Callable[[List[Tuple[str, Any]]], None],
+                 stable_seconds: float = 5, maxsize: int = 10000, name: str = "stability",
+                 on_drop: Optional[Callable[[List[str]], None]] = None):
+        """
+        :param consumer: 消费者，参数为 [(路径, 载荷)] 批次
+        :param stable_seconds: 文件保持不变的秒数，为0时不检测直接放行
+        :param maxsize: 等待文件数上限，超出时添加方阻塞等待
+        :param name: 线程名称
+        :param on_drop: 等待期间已消失（删除、改名）的文件，参数为路径列表
+        """
+        self._consumer = consumer
+        self._on_drop = on_drop
+        self._stable_seconds = max(float(stable_seconds), 0)
+        # 检查周期，稳定时间较短时相应缩短
+        self._interval = min(1.0, self._stable_seconds / 2) if self._stable_seconds else 0
+        self._maxsize = max(int(maxsize), 1)
+        self._name = name
+        # 路径 -> [大小, 修改时间, 开始稳定的时间, 载荷]
+        self._pending: Dict[str, list] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._stable_seconds > 0
+
+    def start(self):
+        """
+        启动检查线程
+        """
+        with self._cond:
+            self._stopped = False
+        if not self.enabled:
+            return
+        self._thread = threading.Thread(target=self.__run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        停止检查线程，等待中的文件将被丢弃
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def add(self, batch: List[Tuple[str, Any]]):
+        """
+        添加一批待检测的文件，已在等待中的文件只更新载荷
+        """
+        if not self.enabled:
+            self._consumer(batch)
+            return
+        now = time.monotonic()
+        with self._cond:
+            for path, payload in batch:
+                while len(self._pending) >= self._maxsize and path not in self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                entry = self._pending.get(path)
+                if entry:
+                    entry[3] = payload
+                    continue
+                size, mtime = self.__stat(path)
+                self._pending[path] = [size, mtime, now, payload]
+            self._cond.notify_all()
+
+    def qsize(self) -> int:
+        """
+        等待稳定的文件数
+        """
+        with self._cond:
+            return len(self._pending)
+
+    @staticmethod
+    def __stat(path: str) -> Tuple[Optional[int], Optional[float]]:
+        """
+        获取文件大小和修改时间，文件不存在时返回None
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None, None
+        return st.st_size, st.st_mtime
+
+    def __sweep(self) -> List[Tuple[str, Any]]:
+        """
+        检查所有等待中的文件，返回已稳定的文件，已消失的文件直接丢弃
+        """
+        with self._cond:
+            items = list(self._pending.items())
+        now = time.monotonic()
+        settled = []
+        gone = []
+        changed = {}
+        for path, entry in items:
+            size, mtime = self.__stat(path)
+            if size is None:
+                gone.append(path)
+            elif size != entry[0] or mtime != entry[1]:
+                changed[path] = (size, mtime)
+            elif now - entry[2] >= self._stable_seconds:
+                settled.append(path)
+        dropped = []
+        with self._cond:
+            for path in gone:
+                if self._pending.pop(path, None) is not None:
+                    logger.debug(f"{path} 已不存在，停止等待")
+                    dropped.append(path)
+            for path, (size, mtime) in changed.items():
+                entry = self._pending.get(path)
+                if entry:
+                    entry[0], entry[1], entry[2] = size, mtime, now
+            batch = []
+            for path in settled:
+                entry = self._pending.pop(path, None)
+                if entry:
+                    batch.append((path, entry[3]))
+            if gone or batch:
+                self._cond.notify_all()
+        if dropped and self._on_drop:
+            try:
+                self._on_drop(dropped)
+            except Exception as e:
+                logger.error(f"处理已消失的文件出错：{e}")
+        return batch
+
+    def __run(self):
+        """
+        周期检查并按批次放行稳定的文件
+        """
+        while True:
+            with self._cond:
+                while not self._stopped and not self._pending:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                self._cond.wait(self._interval)
+                if self._stopped:
+                    return
+            batch = self.__sweep()
+            if not batch:
+                continue
+            logger.debug(f"{len(batch)} 个文件已稳定，开始整理")
+            try:
+                self._consumer(batch)
+            except Exception as e:
+                logger.error(f"{self._name} 处理文件批次出错：{e}")
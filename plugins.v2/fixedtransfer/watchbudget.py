@@ -0,0 +1,129 @@
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.log import logger
+
+# inotify 单用户监控数量上限
+INOTIFY_MAX_WATCHES = "/proc/sys/fs/inotify/max_user_watches"
+
+
+class WatchBudget:
+    """
+    inotify 监控数量预算
+    递归监控时每个目录占用一个 inotify watch，按预算分配：整个目录树放得下时整体监控，
+    放不下时逐个子目录分配，超出预算的子目录交给轮询监控
+    """
+
+    # 未配置预算时使用系统上限的比例，给其它程序留出余量
+    DEFAULT_RATIO = 0.8
+
+    def __init__(self, budget: int = 0):
+        """
+        :param budget: 预算，为0时按系统上限自动计算，无法读取系统上限时不限制
+        """
+        self.limit = self.read_limit()
+        if budget > 0:
+            self.budget: Optional[int] = int(budget)
+        elif self.limit:
+            self.budget = int(self.limit * self.DEFAULT_RATIO)
+        else:
+            self.budget = None
+        self.used = 0
+        # 实时监控的目录 -> 占用数量
+        self.watched: Dict[str, int] = {}
+        # 轮询的监控目录 -> 其下已实时监控的子目录
+        self.polled: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def read_limit() -> Optional[int]:
+        """
+        读取系统 inotify 上限，非Linux系统返回None
+        """
+        try:
+            with open(INOTIFY_MAX_WATCHES) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def count_dirs(path: str) -> int:
+        """
+        统计目录树中的目录数量（含自身），即递归监控需要的 watch 数
+        """
+        count = 0
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            count += 1
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return count
+
+    def plan(self, root: str) -> Tuple[List[str], bool]:
+        """
+        为监控目录分配预算
+        :return: (需要递归实时监控的目录, 监控目录本身是否还需要轮询)
+        """
+        with self._lock:
+            if self.budget is None:
+                self.watched[root] = 0
+                return [root], False
+            total = self.count_dirs(root)
+            if self.used + total <= self.budget:
+                self.used += total
+                self.watched[root] = total
+                return [root], False
+            # 整个目录树放不下，按子目录从小到大分配，尽量多地实时监控
+            children = []
+            try:
+                with os.scandir(root) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                children.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError as e:
+                logger.warn(f"读取目录 {root} 出错：{e}")
+            sized = sorted((self.count_dirs(child), child) for child in children)
+            watch_paths = []
+            for count, child in sized:
+                if self.used + count > self.budget:
+                    break
+                self.used += count
+                self.watched[child] = count
+                watch_paths.append(child)
+            self.polled[root] = watch_paths
+            logger.warn(f"{root} 共 {total} 个目录，超出 inotify 监控预算 {self.budget}（已用 {self.used}），"
+                        f"{len(watch_paths)}/{len(children)} 个子目录实时监控，其余部分改为轮询")
+            return watch_paths, True
+
+    def release(self, path: str):
+        """
+        释放目录占用的预算（监控启动失败时）
+        """
+        with self._lock:
+            self.used -= self.watched.pop(path, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        预算使用情况
+        """
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "budget": self.budget,
+                "used": self.used,
+                "watched": dict(self.watched),
+                "polled": {root: list(children) for root, children in self.polled.items()}
+            }